@@ -0,0 +1,153 @@
+# src/control/planificador.py
+"""
+Planificador de actuadores
+--------------------------
+Un único hilo con una cola de temporizadores (heap) que ejecuta, en serie,
+las operaciones diferidas de todos los actuadores (p. ej. fin del pulso de
+cierre de la compuerta). Sustituye a un threading.Timer por operación.
+
+Con un utils.reloj.RelojSimulado no hay hilo: el planificador se suscribe
+al reloj y sus tareas se ejecutan cuando el reloj avanza hasta su instante.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+
+from utils.reloj import RELOJ_SISTEMA
+
+log = logging.getLogger(__name__)
+
+
+class Tarea:
+    """Operación programada. Se puede cancelar mientras no se haya ejecutado."""
+
+    __slots__ = ("instante", "orden", "fn", "args", "cancelada", "ejecutada")
+
+    def __init__(self, instante, orden, fn, args):
+        self.instante  = instante
+        self.orden     = orden
+        self.fn        = fn
+        self.args      = args
+        self.cancelada = False
+        self.ejecutada = False
+
+    def __lt__(self, otra):
+        return (self.instante, self.orden) < (otra.instante, otra.orden)
+
+
+class PlanificadorActuadores:
+    """
+    Cola de temporizadores atendida por un solo hilo 'daemon'.
+
+      programar(retardo, fn, *args) → Tarea
+      cancelar(tarea)               → True si no llegó a ejecutarse
+    """
+
+    def __init__(self, nombre="planificador-actuadores", reloj=None):
+        self.reloj    = reloj or RELOJ_SISTEMA
+        self._cola    = []
+        self._orden   = itertools.count()
+        self._cond    = threading.Condition()
+        self._activo  = True
+        self._hilo    = None
+        if self.reloj.simulado:
+            self.reloj.suscribir(self)
+        else:
+            self._hilo = threading.Thread(target=self._bucle, name=nombre, daemon=True)
+            self._hilo.start()
+
+    def programar(self, retardo: float, fn, *args) -> Tarea:
+        with self._cond:
+            tarea = Tarea(self.reloj.monotonic() + retardo, next(self._orden), fn, args)
+            heapq.heappush(self._cola, tarea)
+            self._cond.notify()
+        return tarea
+
+    def cancelar(self, tarea: Tarea | None) -> bool:
+        if tarea is None:
+            return False
+        with self._cond:
+            pendiente = not (tarea.cancelada or tarea.ejecutada)
+            tarea.cancelada = True
+        return pendiente
+
+    def pendientes(self) -> int:
+        with self._cond:
+            return sum(1 for t in self._cola if not t.cancelada)
+
+    def detener(self) -> None:
+        with self._cond:
+            self._activo = False
+            self._cond.notify()
+        if self._hilo is not None:
+            self._hilo.join(timeout=1)
+
+    # --- Suscriptor de utils.reloj.RelojSimulado ---
+    def proximo_vencimiento(self) -> float | None:
+        with self._cond:
+            while self._cola and self._cola[0].cancelada:
+                heapq.heappop(self._cola)
+            if not self._activo or not self._cola:
+                return None
+            return self._cola[0].instante
+
+    def ejecutar_vencidas(self) -> None:
+        while True:
+            with self._cond:
+                if not self._activo or not self._cola:
+                    return
+                if self._cola[0].instante > self.reloj.monotonic():
+                    return
+                tarea = heapq.heappop(self._cola)
+                if tarea.cancelada:
+                    continue
+                tarea.ejecutada = True
+            self._ejecutar(tarea)
+
+    def _bucle(self) -> None:
+        while True:
+            with self._cond:
+                while self._activo:
+                    # Las canceladas se descartan sin despertar al actuador
+                    while self._cola and self._cola[0].cancelada:
+                        heapq.heappop(self._cola)
+                    if not self._cola:
+                        self._cond.wait()
+                        continue
+                    espera = self._cola[0].instante - self.reloj.monotonic()
+                    if espera <= 0:
+                        break
+                    self._cond.wait(espera)
+                if not self._activo:
+                    return
+                tarea = heapq.heappop(self._cola)
+                tarea.ejecutada = True
+            self._ejecutar(tarea)
+
+    @staticmethod
+    def _ejecutar(tarea: Tarea) -> None:
+        try:
+            tarea.fn(*tarea.args)
+        except Exception:
+            log.error("Error ejecutando tarea programada %r", tarea.fn, exc_info=True)
+
+
+# ---------- INSTANCIA COMPARTIDA ----------
+_compartido      = None
+_compartido_lock = threading.Lock()
+
+
+def obtener_planificador(reloj=None) -> PlanificadorActuadores:
+    """Planificador común a todos los actuadores del mismo reloj (se crea al primer uso)."""
+    global _compartido
+    with _compartido_lock:
+        if reloj is not None and reloj.simulado:
+            # Uno por reloj simulado, guardado en el propio reloj
+            if getattr(reloj, "planificador", None) is None:
+                reloj.planificador = PlanificadorActuadores(reloj=reloj)
+            return reloj.planificador
+        if _compartido is None:
+            _compartido = PlanificadorActuadores()
+        return _compartido
@@ -3,6 +3,9 @@
 import logging
 import threading
 
+from control.planificador import obtener_planificador
+from utils.reloj import RELOJ_SISTEMA
+
 log = logging.getLogger(__name__)
 
 # ---------------- GPIO OPCIONAL ----------------
@@ -24,6 +27,9 @@ TEMP_OFF    = 32.9   # °C – apagar ventilador y cerrar compuerta
 # Duración del pulso de cierre del actuador (segundos)
 PULSO_CIERRE = 15.0
 
+# Tiempo mínimo en un estado antes de permitir el contrario (anti-oscilación)
+TIEMPO_MIN_ESTADO = 30.0
+
 class VentiladorCtrl:
     """
     Lógica de control para:
@@ -33,6 +39,9 @@ class VentiladorCtrl:
     Solo se basa en la temperatura del armario:
       Temp ≥ TEMP_ON  → Ventilador ON, compuerta ABIERTA
       Temp ≤ TEMP_OFF → Ventilador OFF, compuerta CERRADA
+
+    Las operaciones diferidas (fin del pulso de cierre) las ejecuta el
+    planificador compartido; todo cambio de estado se hace bajo self._lock.
     """
 
     def __init__(
@@ -40,19 +49,28 @@ class VentiladorCtrl:
         pin_vent=PIN_VENTILADOR,
         pin_act=PIN_ACTUADOR_CERRAR,
         temp_on=TEMP_ON,
-        temp_off=TEMP_OFF
+        temp_off=TEMP_OFF,
+        tiempo_min_estado=TIEMPO_MIN_ESTADO,
+        planificador=None,
+        reloj=None
     ):
         # Pines y umbrales
         self.pin_vent        = pin_vent
         self.pin_act         = pin_act
         self.temp_on         = temp_on
         self.temp_off        = temp_off
+        self.tiempo_min_estado = tiempo_min_estado
+        self.reloj           = reloj or RELOJ_SISTEMA
+        self.planificador    = planificador or obtener_planificador(self.reloj)
 
         # Estados internos
         self.estado_vent       = False  # usado internamente
         self.estado_ventilador = False  # alias para tests
         self.estado_act        = False  # True = compuerta cerrada
         self._timer_act       = None
+        self._pulso_id        = 0      # invalida pulsos de cierre antiguos
+        self._ultimo_cambio   = None   # reloj.monotonic() del último cambio
+        self._lock            = threading.RLock()
 
         # Configuración GPIO
         if GPIO_DISPONIBLE:
@@ -69,59 +87,96 @@ class VentiladorCtrl:
         if temperatura is None:
             return
 
-        # Encender si supera umbral alto y estaba apagado
-        if temperatura >= self.temp_on and not self.estado_vent:
-            self._encender()
-
-        # Apagar si baja de umbral bajo y estaba encendido
-        elif temperatura <= self.temp_off and self.estado_vent:
-            self._apagar()
+        with self._lock:
+            # Encender si supera umbral alto y estaba apagado
+            if temperatura >= self.temp_on and not self.estado_vent:
+                if self._permanencia_cumplida():
+                    self._encender()
+
+            # Apagar si baja de umbral bajo y estaba encendido
+            elif temperatura <= self.temp_off and self.estado_vent:
+                if self._permanencia_cumplida():
+                    self._apagar()
+
+    def estado(self) -> dict:
+        """Copia coherente del estado (segura desde cualquier hilo)."""
+        with self._lock:
+            return {
+                "ventilador":       self.estado_vent,
+                "actuador_activo":  self.estado_act,
+                "pulso_pendiente":  self._timer_act is not None,
+                "ultimo_cambio":    self._ultimo_cambio,
+            }
+
+    def _permanencia_cumplida(self) -> bool:
+        if self._ultimo_cambio is None:
+            return True
+        transcurrido = self.reloj.monotonic() - self._ultimo_cambio
+        if transcurrido < self.tiempo_min_estado:
+            log.debug("Cambio ignorado: %.1fs en el estado actual (< %.1fs)",
+                      transcurrido, self.tiempo_min_estado)
+            return False
+        return True
 
     def _encender(self) -> None:
-        if GPIO_DISPONIBLE:
-            GPIO.output(self.pin_vent, GPIO.HIGH)   # Ventilador ON
-            GPIO.output(self.pin_act,  GPIO.LOW)    # Compuerta ABIERTA
+        with self._lock:
+            self._cancelar_timer()
+            if GPIO_DISPONIBLE:
+                GPIO.output(self.pin_vent, GPIO.HIGH)   # Ventilador ON
+                GPIO.output(self.pin_act,  GPIO.LOW)    # Compuerta ABIERTA
 
-        self.estado_vent        = True
-        self.estado_ventilador = True
-        self.estado_act         = False
-        self._cancelar_timer()
+            self.estado_vent        = True
+            self.estado_ventilador = True
+            self.estado_act         = False
+            self._ultimo_cambio     = self.reloj.monotonic()
 
         log.info(" Ventilador ON  |  Compuerta ABIERTA")
 
     def _apagar(self) -> None:
-        if GPIO_DISPONIBLE:
-            GPIO.output(self.pin_vent, GPIO.LOW)    # Ventilador OFF
-            GPIO.output(self.pin_act,  GPIO.HIGH)   # Inicia cierre compuerta
-
-        self.estado_vent        = False
-        self.estado_ventilador = False
-        self.estado_act         = True
+        with self._lock:
+            self._cancelar_timer()
+            if GPIO_DISPONIBLE:
+                GPIO.output(self.pin_vent, GPIO.LOW)    # Ventilador OFF
+                GPIO.output(self.pin_act,  GPIO.HIGH)   # Inicia cierre compuerta
+
+            self.estado_vent        = False
+            self.estado_ventilador = False
+            self.estado_act         = True
+            self._ultimo_cambio     = self.reloj.monotonic()
+
+            # Tras PULSO_CIERRE segundos, liberar actuador
+            self._pulso_id += 1
+            self._timer_act = self.planificador.programar(
+                PULSO_CIERRE, self._reset_act, self._pulso_id
+            )
 
         log.info(" Ventilador OFF | Cerrando compuerta…")
 
-        # Tras PULSO_CIERRE segundos, liberar actuador
-        self._timer_act = threading.Timer(PULSO_CIERRE, self._reset_act)
-        self._timer_act.start()
-
-    def _reset_act(self) -> None:
-        if GPIO_DISPONIBLE:
-            GPIO.output(self.pin_act, GPIO.LOW)    # Compuerta relajada
+    def _reset_act(self, pulso_id: int | None = None) -> None:
+        with self._lock:
+            # Un pulso ya sustituido por otro apagado/encendido no debe tocar el pin
+            if pulso_id is not None and pulso_id != self._pulso_id:
+                return
+            if GPIO_DISPONIBLE:
+                GPIO.output(self.pin_act, GPIO.LOW)    # Compuerta relajada
 
-        self.estado_act = False
-        self._timer_act = None
+            self.estado_act = False
+            self._timer_act = None
 
         log.info(" Actuador y ventilador desactivados ")
 
     def _cancelar_timer(self) -> None:
-        if self._timer_act:
-            self._timer_act.cancel()
-            self._timer_act = None
+        with self._lock:
+            if self._timer_act:
+                self.planificador.cancelar(self._timer_act)
+                self._timer_act = None
+            self._pulso_id += 1
 
     def cleanup(self) -> None:
-        """Detiene timers y deja todos los pines en LOW."""
-        self._cancelar_timer()
-        if GPIO_DISPONIBLE:
-            GPIO.output(self.pin_vent, GPIO.LOW)
-            GPIO.output(self.pin_act,  GPIO.LOW)
+        """Cancela el pulso pendiente y deja todos los pines en LOW."""
+        with self._lock:
+            self._cancelar_timer()
+            if GPIO_DISPONIBLE:
+                GPIO.output(self.pin_vent, GPIO.LOW)
+                GPIO.output(self.pin_act,  GPIO.LOW)
         log.info("VentiladorCtrl limpiado")
@@ -18,32 +18,68 @@ import logging
 log = logging.getLogger(__name__)
 
 # ─── IMPORTS PRINCIPALES ───────────────────────────────────────────────────────
-from sensors.manager      import GestorSensores
+from sensors.estaciones   import (
+    EjecutorEstaciones, cargar_inventario, crear_estaciones, inventario_por_defecto,
+    STATION_ID_POR_DEFECTO
+)
+from sensors.descubrimiento import DescubridorModbus
 from control.ventilador   import VentiladorCtrl
-from utils.temp_cpu       import obtener_temperatura_cpu
-from utils.csv_export     import export_row
-from utils.tb_client      import publish_telemetry
+from utils.salud_host     import MonitorSaludHost
+from utils.diagnostico    import Diagnostico
+from utils.csv_export     import export_row, ruta_csv, CSV_FILE
+from utils.tb_client      import publish_telemetry, publish_telemetry_binaria
+from utils.codificacion   import CodificadorTelemetria
+from utils.memoria_compartida import PublicadorMemoria
 from utils.git_info       import get_git_commit
+from utils.pipeline       import PipelineSumideros
+from utils.esquema        import CAMPOS_EXPORT
+from utils.reloj          import RELOJ_SISTEMA
+from utils.sincronizacion import SincronizadorDatos, PERIODO as PERIODO_SYNC, FILAS_POR_BLOQUE
 
 # ─── CONSTANTES ────────────────────────────────────────────────────────────────
 INTERVALO = 10  # segundos entre muestras
 
-CAMPOS_EXPORT = [
-    "timestamp",
-    # Meteorología
-    "direccion_viento", "velocidad_viento_prom", "velocidad_viento_max",
-    "temperatura", "humedad", "presion", "luz", "indice_uv", "lluvia",
-    # Suelo
-    "humedad_suelo", "temperatura_suelo", "conductividad_suelo", "ph_suelo",
-    # Armario
-    "temperatura_armario", "humedad_armario",
-    # Canales espectrales
-    "A_410nm","B_435nm","C_460nm","D_485nm","E_510nm","F_535nm","G_560nm",
-    "H_585nm","R_610nm","I_645nm","S_680nm","J_705nm","T_730nm","U_760nm",
-    "V_810nm","W_860nm","K_900nm","L_940nm","temp_0","temp_1","temp_2",
-    # CPU y Git
-    "temperatura_cpu", "git_commit"
-]
+# Inventario de estaciones (si no existe, una sola estación con las constantes de sensors.manager)
+RUTA_ESTACIONES = os.environ.get("TFM_ESTACIONES", os.path.join(BASE_DIR, "estaciones.json"))
+
+# Descubrimiento Modbus al arrancar (TFM_DESCUBRIMIENTO=0 lo desactiva); la
+# caché evita repetir el barrido si los dispositivos no han cambiado
+DESCUBRIMIENTO_MODBUS = os.environ.get("TFM_DESCUBRIMIENTO", "1") != "0"
+RUTA_DESCUBRIMIENTO   = os.path.join(BASE_DIR, "descubrimiento_modbus.json")
+
+# Sumideros: cola propia por sumidero para que la E/S no frene la adquisición
+SUMIDEROS = {
+    "csv":       {"capacidad": 100, "politica": "volcar_disco",
+                  "ruta_volcado": os.path.join(BASE_DIR, "cola_csv.jsonl")},
+    "http":      {"capacidad": 100, "politica": "volcar_disco",
+                  "ruta_volcado": os.path.join(BASE_DIR, "cola_http.jsonl")},
+    "dashboard": {"capacidad": 1,   "politica": "descartar_antiguo"},
+    "memoria":   {"capacidad": 10,  "politica": "descartar_antiguo"},
+}
+SUMIDERO_INYECTADO = {"capacidad": 100, "politica": "bloquear"}   # main(sumideros=...)
+INFORME_PIPELINE_CADA = 60  # muestras entre informes de contadores
+
+# Formato de la telemetría HTTP: "json" (completo) o "binario" (utils.codificacion)
+FORMATO_TELEMETRIA = os.environ.get("TFM_FORMATO_TELEMETRIA", "json")
+
+# Los datos se suben con SincronizadorDatos; el auto-commit de git queda solo
+# para código y desactivado salvo TFM_AUTO_GIT=1
+AUTO_GIT = os.environ.get("TFM_AUTO_GIT") == "1"
+PATRON_DATOS = "{}*{}".format(*os.path.splitext(CSV_FILE))
+
+# Recorte de carga según la salud del host (temperatura del SoC, carga, memoria)
+#   cada_n_espectral → lectura espectral 1 de cada N ciclos (0 = ninguna)
+#   bulbo            → False fuerza medir sin bombilla (True = lo que diga el perfil)
+#   dashboard        → False pausa la tabla por pantalla
+#   sync_*           → subidas menos frecuentes y en bloques más grandes
+RECORTES_SALUD = {
+    "normal":    {"cada_n_espectral": 1, "bulbo": True,  "dashboard": True,
+                  "sync_periodo": PERIODO_SYNC,     "sync_filas": FILAS_POR_BLOQUE},
+    "degradado": {"cada_n_espectral": 6, "bulbo": False, "dashboard": False,
+                  "sync_periodo": 3 * PERIODO_SYNC, "sync_filas": 4 * FILAS_POR_BLOQUE},
+    "critico":   {"cada_n_espectral": 0, "bulbo": False, "dashboard": False,
+                  "sync_periodo": 6 * PERIODO_SYNC, "sync_filas": 10 * FILAS_POR_BLOQUE},
+}
 
 SECCIONES = OrderedDict([
     ("Meteorología", CAMPOS_EXPORT[1:10]),
@@ -82,8 +118,8 @@ def clear_screen():
 
 def print_table(datos: dict):
     clear_screen()
-    ts = time.strftime("%Y-%m-%d %H:%M:%S")
-    print(f"🕒 {ts}    (Ctrl+C para salir)\n")
+    ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(datos.get("timestamp")))
+    print(f"🕒 {ts}    Estación: {datos.get('station_id', '--')}    (Ctrl+C para salir)\n")
 
     W_CAMPO = 30
     W_VALOR = 12
@@ -104,43 +140,171 @@ def print_table(datos: dict):
             print(f"{campo:<{W_CAMPO}} | {val:>{W_VALOR}} | {unidad:<{W_UNIDAD}}")
     print()
 
-def main():
+def publicador_binario():
+    """Sumidero HTTP binario: un codificador (con su estado delta) por estación."""
+    codificadores = {}
+
+    def publicar(datos):
+        sid = datos.get("station_id", "")
+        if sid not in codificadores:
+            codificadores[sid] = CodificadorTelemetria(sid)
+        cod = codificadores[sid]
+        if not publish_telemetry_binaria(cod.codificar(datos)):
+            # El receptor no tendrá la referencia: la siguiente va completa
+            cod.forzar_clave()
+
+    return publicar
+
+def publicador_memoria(publicadores: dict):
+    """Sumidero de memoria compartida (utils.memoria_compartida): una región por estación."""
+
+    def publicar(datos):
+        sid = datos.get("station_id", STATION_ID_POR_DEFECTO)
+        if sid not in publicadores:
+            publicadores[sid] = PublicadorMemoria(sid)
+        publicadores[sid].publicar(datos)
+
+    return publicar
+
+def aplicar_nivel_salud(nivel, estaciones, bulbo_configurado, pipeline, sincronizador):
+    """Aplica RECORTES_SALUD[nivel]; volver a "normal" restaura la configuración."""
+    recorte = RECORTES_SALUD[nivel]
+
+    for est in estaciones:
+        est.cada_n_espectral = recorte["cada_n_espectral"]
+        est.gestor.perfil_espectral.usar_bulbo = (
+            recorte["bulbo"] and bulbo_configurado[est.station_id]
+        )
+
+    dashboard = pipeline.sumidero("dashboard")
+    if recorte["dashboard"] and dashboard.pausado:
+        dashboard.reanudar()
+    elif not recorte["dashboard"] and not dashboard.pausado:
+        dashboard.pausar()
+
+    sincronizador.periodo          = recorte["sync_periodo"]
+    sincronizador.filas_por_bloque = recorte["sync_filas"]
+
+    log.info("Nivel de salud %s aplicado: %s", nivel, recorte)
+
+def sumideros_por_defecto(diagnostico, memorias: dict) -> dict:
+    """Sumideros de producción: {nombre: fn(datos)} (opciones en SUMIDEROS)."""
+    if FORMATO_TELEMETRIA == "binario":
+        publicar_http = publicador_binario()
+    else:
+        publicar_http = publish_telemetry
+    return {
+        "csv":       diagnostico.envolver("csv", lambda d: export_row(
+            d, CAMPOS_EXPORT, ruta_csv(d.get("station_id")))),
+        "http":      diagnostico.envolver("http", publicar_http),
+        "dashboard": diagnostico.envolver("dashboard", print_table),
+        "memoria":   publicador_memoria(memorias),
+    }
+
+def main(reloj=None, duracion=None, sumideros=None, inventario=None):
+    """
+    reloj      → utils.reloj (por defecto el del sistema). Con un
+                 RelojSimulado no se arranca nada que dependa del tiempo
+                 real o del exterior: auto-git, sincronización, descubrimiento
+                 Modbus, monitor de salud del host, señales ni los sumideros
+                 de producción (solo se usan los de 'sumideros').
+    duracion   → segundos de reloj tras los que se para (None = indefinido)
+    sumideros  → {nombre: fn(datos)} en lugar de los de producción
+    inventario → estaciones (por defecto RUTA_ESTACIONES o inventario_por_defecto)
+    """
+    reloj = reloj or RELOJ_SISTEMA
+    simulado = reloj.simulado
     log.info("▶️ Arrancando sistema headless con CSV, ThingsBoard y Git Info")
 
-    # ─── AUTO-GIT ───────────────────────────────────────────────
-    from utils.git_auto import auto_commit_and_push
-    auto_commit_and_push()
+    # ─── AUTO-GIT (solo código) ─────────────────────────────────
+    if AUTO_GIT and not simulado:
+        from utils.git_auto import auto_commit_and_push
+        auto_commit_and_push()
     # ─────────────────────────────────────────────────────────────
 
-    sensores   = GestorSensores()
-    ventilador = VentiladorCtrl()
+    sincronizador = None
+    if not simulado:
+        sincronizador = SincronizadorDatos(PATRON_DATOS)
+        sincronizador.iniciar()
+
+    if inventario is None:
+        if os.path.isfile(RUTA_ESTACIONES):
+            inventario = cargar_inventario(RUTA_ESTACIONES)
+            log.info("Inventario cargado de %s (%d estaciones)", RUTA_ESTACIONES, len(inventario))
+        else:
+            inventario = inventario_por_defecto(INTERVALO)
+    if DESCUBRIMIENTO_MODBUS and not simulado:
+        inventario = DescubridorModbus(RUTA_DESCUBRIMIENTO).descubrir(inventario)
+
+    estaciones = crear_estaciones(inventario, reloj=reloj)
+
+    # Diagnóstico opcional (TFM_DIAGNOSTICO=1 o SIGUSR1): perfila cada unidad
+    # de trabajo en su hilo y vigila la memoria una vez por ciclo
+    diagnostico = Diagnostico()
+    if not simulado:
+        diagnostico.instalar_senal()
+    for est in estaciones:
+        est.leer = diagnostico.envolver(f"leer_{est.station_id}", est.leer)
+    ventilador = VentiladorCtrl(reloj=reloj)
     git_commit = get_git_commit()
 
-    try:
-        while True:
-            datos = sensores.leer_todo()
+    pipeline = PipelineSumideros()
+    memorias = {}
+    if sumideros is not None:
+        for nombre, fn in sumideros.items():
+            pipeline.agregar(nombre, fn, **SUMIDERO_INYECTADO)
+    elif not simulado:
+        for nombre, fn in sumideros_por_defecto(diagnostico, memorias).items():
+            pipeline.agregar(nombre, fn, **SUMIDEROS[nombre])
+    muestras = 0
 
-            temp_cpu = obtener_temperatura_cpu()
-            datos["temperatura_cpu"] = temp_cpu
+    salud = None
+    if not simulado:
+        salud = MonitorSaludHost()
+        bulbo_configurado = {e.station_id: e.gestor.perfil_espectral.usar_bulbo for e in estaciones}
+        salud.al_cambiar(lambda nivel, _lectura: aplicar_nivel_salud(
+            nivel, estaciones, bulbo_configurado, pipeline, sincronizador
+        ))
 
-            datos["git_commit"] = git_commit
+    def _procesar_muestra(estacion, datos):
+        nonlocal muestras
+        diagnostico.registrar_ciclo()
+        datos["timestamp"] = reloj.time()
+        if salud is not None:
+            datos["temperatura_cpu"] = salud.evaluar()["temperatura_cpu"]
 
+        datos["git_commit"] = git_commit
+
+        if estacion.ventilador:
             ventilador.controlar_por_temperatura(datos.get("temperatura_armario"))
-            
-            export_row(datos, CAMPOS_EXPORT)
 
-            publish_telemetry(datos)
+        # Una sola publicación; cada sumidero la consume en su hilo
+        pipeline.publicar(datos)
+
+        muestras += 1
+        if muestras % INFORME_PIPELINE_CADA == 0:
+            for nombre, est in pipeline.estadisticas().items():
+                log.info("Sumidero %-10s %s", nombre, est)
 
-            print_table(datos)
+    procesar_muestra = diagnostico.envolver("procesar_muestra", _procesar_muestra)
+    ejecutor = EjecutorEstaciones(estaciones, procesar_muestra, reloj=reloj)
 
-            time.sleep(INTERVALO)
+    try:
+        ejecutor.ejecutar(hasta=reloj.monotonic() + duracion if duracion else None)
 
     except KeyboardInterrupt:
         log.info("🛑 Detenido por usuario")
     finally:
         log.info("🧹 Limpiando sensores y GPIO")
-        sensores.cleanup()
+        ejecutor.cleanup()
         ventilador.cleanup()
+        pipeline.detener()
+        for memoria in memorias.values():
+            memoria.cerrar()
+        if sincronizador is not None:
+            sincronizador.detener()
+        if salud is not None:
+            salud.cerrar()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,166 @@
+# sensors/adaptativo.py
+"""
+Muestreo adaptativo
+-------------------
+Reglas para no gastar bus ni energía en lecturas inútiles y, a la vez,
+captar mejor los eventos rápidos:
+
+  • Sin luz (luz < luz_min_espectral) no se lee el AS7265x: de noche los
+    canales y los índices no significan nada. La luz es la de la lectura
+    meteorológica del mismo ciclo (o la última conocida).
+  • Si algún campo vigilado cambia más rápido que su tasa máxima
+    (unidades/s), el intervalo baja a intervalo * factor_rapido. Los
+    cambios de hasta un paso de resolución del sensor (RESOLUCION) son
+    ruido de cuantización y no cuentan.
+  • Si todos cambian menos de tasa * FRACCION_ESTABLE durante
+    'ciclos_estable' ciclos seguidos, el intervalo se multiplica por
+    'factor_espaciado' (hasta intervalo_max).
+  • En cualquier otro caso se vuelve al intervalo base.
+
+En una estación que gobierna el ventilador, crear_estaciones() limita
+intervalo_max al intervalo base: el control del armario no se ralentiza.
+
+Cada decisión se registra en el log: INFO cuando cambia, DEBUG cuando se
+mantiene.
+"""
+
+import logging
+
+log = logging.getLogger(__name__)
+
+LUZ_MIN_ESPECTRAL = 10.0   # lx
+# Campo → tasa de cambio máxima antes de acelerar (unidades por segundo)
+TASAS_MAX = {
+    "temperatura":           1.0 / 60,   # 1 °C/min
+    "humedad":               5.0 / 60,   # 5 %/min
+    "presion":               1.0 / 600,  # 1 hPa/10 min
+    "velocidad_viento_prom": 2.0 / 60,   # 2 m/s por minuto
+    "lluvia":                0.5 / 60,   # 0,5 mm/min
+    "temperatura_armario":   0.5 / 60,   # 0,5 °C/min (gobierna el ventilador)
+}
+# Campo → resolución del sensor (un paso del registro Modbus)
+RESOLUCION = {
+    "temperatura":           0.1,
+    "humedad":               0.1,
+    "presion":               1.0,
+    "velocidad_viento_prom": 0.01,
+    "lluvia":                0.1,
+    "temperatura_armario":   0.1,
+}
+FRACCION_ESTABLE = 0.1     # "estable" = por debajo del 10 % de la tasa máxima
+CICLOS_ESTABLE   = 6
+FACTOR_RAPIDO    = 0.25
+FACTOR_ESPACIADO = 2.0
+INTERVALO_MIN    = 2.0     # s
+MAX_ESPACIADO    = 6       # intervalo_max = intervalo base * MAX_ESPACIADO
+
+
+class PoliticaMuestreo:
+    """Estado de las reglas para UNA estación."""
+
+    def __init__(
+        self,
+        intervalo,
+        luz_min_espectral=LUZ_MIN_ESPECTRAL,
+        tasas_max=None,
+        resoluciones=None,
+        ciclos_estable=CICLOS_ESTABLE,
+        factor_rapido=FACTOR_RAPIDO,
+        factor_espaciado=FACTOR_ESPACIADO,
+        intervalo_min=INTERVALO_MIN,
+        intervalo_max=None,
+        station_id=""
+    ):
+        if factor_rapido <= 0 or factor_rapido > 1 or factor_espaciado < 1:
+            raise ValueError("factor_rapido debe estar en (0, 1] y factor_espaciado ser ≥ 1")
+
+        self.intervalo_base    = float(intervalo)
+        self.luz_min_espectral = luz_min_espectral
+        self.tasas_max         = dict(TASAS_MAX if tasas_max is None else tasas_max)
+        self.resoluciones      = dict(RESOLUCION if resoluciones is None else resoluciones)
+        self.ciclos_estable    = ciclos_estable
+        self.factor_rapido     = factor_rapido
+        self.factor_espaciado  = factor_espaciado
+        self.intervalo_min     = min(intervalo_min, self.intervalo_base)
+        self.intervalo_max     = max(self.intervalo_base, intervalo_max if intervalo_max is not None
+                                     else self.intervalo_base * MAX_ESPACIADO)
+        self.station_id        = station_id
+
+        self.intervalo   = self.intervalo_base
+        self._estables   = 0
+        self._anterior   = None     # (instante, {campo: valor})
+        self._ultima_luz = None
+        self._espectral  = True     # última decisión sobre el espectral
+        self.contadores  = {"espectral_omitido": 0, "acelerado": 0, "espaciado": 0}
+
+    @classmethod
+    def desde_dict(cls, intervalo, cfg: dict | None, station_id="") -> "PoliticaMuestreo":
+        return cls(intervalo, station_id=station_id, **(cfg or {}))
+
+    # ---------- ESPECTRAL ----------
+    def leer_espectral(self, datos: dict) -> bool:
+        """False si no merece la pena leer el espectral con la luz de 'datos'."""
+        luz = datos.get("luz", self._ultima_luz)
+        if isinstance(luz, (int, float)):
+            self._ultima_luz = luz
+        leer = self.luz_min_espectral is None or not isinstance(luz, (int, float)) \
+            or luz >= self.luz_min_espectral
+
+        nivel = logging.INFO if leer != self._espectral else logging.DEBUG
+        if leer:
+            log.log(nivel, "Estación %s: espectral leído (luz %s lx)", self.station_id, luz)
+        else:
+            self.contadores["espectral_omitido"] += 1
+            log.log(nivel, "Estación %s: espectral omitido (luz %s lx < %s lx)",
+                    self.station_id, luz, self.luz_min_espectral)
+        self._espectral = leer
+        return leer
+
+    # ---------- INTERVALO ----------
+    def actualizar(self, datos: dict, instante: float) -> float:
+        """Ajusta el intervalo con la muestra recién leída y lo devuelve."""
+        actuales = {c: datos[c] for c in self.tasas_max
+                    if isinstance(datos.get(c), (int, float))}
+        anterior, self._anterior = self._anterior, (instante, actuales)
+        if anterior is None or instante <= anterior[0]:
+            return self.intervalo
+
+        dt = instante - anterior[0]
+        tasas = {c: max(0.0, abs(v - anterior[1][c]) - self.resoluciones.get(c, 0.0)) / dt
+                 for c, v in actuales.items() if c in anterior[1]}
+        rapidos = {c: t for c, t in tasas.items() if t > self.tasas_max[c]}
+
+        if rapidos:
+            self._estables = 0
+            nuevo = max(self.intervalo_min, self.intervalo_base * self.factor_rapido)
+            motivo = ", ".join(f"{c} {t:.4g}/s > {self.tasas_max[c]:.4g}/s"
+                               for c, t in sorted(rapidos.items()))
+            if nuevo != self.intervalo:
+                self.contadores["acelerado"] += 1
+        elif tasas and all(t <= self.tasas_max[c] * FRACCION_ESTABLE for c, t in tasas.items()):
+            self._estables += 1
+            nuevo = max(self.intervalo, self.intervalo_base)
+            motivo = f"estable {self._estables}/{self.ciclos_estable} ciclos"
+            if self._estables >= self.ciclos_estable:
+                self._estables = 0
+                nuevo = min(self.intervalo_max, nuevo * self.factor_espaciado)
+                if nuevo != self.intervalo:
+                    self.contadores["espaciado"] += 1
+        else:
+            self._estables = 0
+            nuevo = self.intervalo_base
+            motivo = "cambios normales" if tasas else "sin campos vigilados"
+
+        nivel = logging.INFO if nuevo != self.intervalo else logging.DEBUG
+        log.log(nivel, "Estación %s: intervalo %.1f s → %.1f s (%s)",
+                self.station_id, self.intervalo, nuevo, motivo)
+        self.intervalo = nuevo
+        return nuevo
+
+    def estado(self) -> dict:
+        return {
+            "intervalo":  self.intervalo,
+            "espectral":  self._espectral,
+            "estables":   self._estables,
+            **self.contadores,
+        }
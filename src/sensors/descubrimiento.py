@@ -0,0 +1,251 @@
+# sensors/descubrimiento.py
+"""
+Descubrimiento de dispositivos Modbus
+-------------------------------------
+Si un técnico cambia una sonda por otra con distinta dirección o velocidad,
+la estación ya no la encuentra en la configurada y pasa a datos simulados.
+Antes de crear las estaciones se comprueba cada dispositivo Modbus del
+inventario y, si no responde donde se esperaba, se busca:
+
+  1. Se prueban la dirección/velocidad configuradas y las de la caché en
+     disco. Si así se encuentran todos, no hay barrido.
+  2. Si falta alguno, se barre su puerto: velocidades de BAUDIOS y
+     direcciones de DIRECCIONES, con timeouts cortos. Los puertos se
+     barren en paralelo (un hilo por puerto; dentro de un bus RS-485 las
+     sondas van en serie).
+  3. Cada esclavo que responde se identifica por su firma de registros
+     (FIRMAS: qué registros tiene y en qué rangos caen sus valores). Se
+     prueban todas las firmas, porque muchas sondas no contestan a los
+     registros que no tienen; una dirección vacía cuesta un timeout por firma.
+
+El inventario se devuelve corregido y el resultado se guarda en la caché.
+Un mismo puerto puede quedar con sondas a velocidades distintas: el
+gestor fija la de cada esclavo antes de cada transacción (configurar_serie).
+"""
+
+import copy
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sensors.manager import MODBUS_DISPONIBLE, bloqueo_bus
+
+if MODBUS_DISPONIBLE:
+    import minimalmodbus
+
+log = logging.getLogger(__name__)
+
+RUTA_CACHE     = "descubrimiento_modbus.json"
+BAUDIOS        = (9600, 4800, 19200, 2400)
+DIRECCIONES    = range(1, 33)
+TIMEOUT_SONDEO = 0.15   # s por petición (a 2400 baudios una respuesta tarda < 60 ms)
+
+TIPOS_MODBUS = ("meteorologico", "suelo", "xy_md04")
+
+# Tipo → registros que se leen y rango válido de cada uno (con signo)
+FIRMAS = {
+    "meteorologico": {"registro": 0x01F8, "cantidad": 2, "funcion": 3,
+                      "rangos": ((0, 1000), (-400, 850))},             # humedad, temperatura
+    "xy_md04":       {"registro": 0x0001, "cantidad": 2, "funcion": 4,
+                      "rangos": ((-400, 850), (0, 1000))},             # temperatura, humedad
+    "suelo":         {"registro": 0x0000, "cantidad": 4, "funcion": 3,
+                      "rangos": ((0, 1000), (-400, 850), (0, 20000), (0, 140))},
+}
+
+# Excepción con la que un esclavo contesta "no tengo eso": el esclavo existe
+if MODBUS_DISPONIBLE:
+    ErrorEsclavo = minimalmodbus.SlaveReportedException
+else:
+    class ErrorEsclavo(IOError):
+        """Respuesta de excepción Modbus (sustituye a la de minimalmodbus)."""
+
+
+def _instrumento_rtu(puerto, direccion, baudrate, timeout):
+    inst = minimalmodbus.Instrument(puerto, direccion)
+    inst.serial.baudrate = baudrate
+    inst.serial.timeout  = timeout
+    inst.mode = minimalmodbus.MODE_RTU
+    inst.clear_buffers_before_each_transaction = True
+    return inst
+
+
+def _con_signo(v: int) -> int:
+    return v - 0x10000 if v >= 0x8000 else v
+
+
+class DescubridorModbus:
+    """
+    crear_instrumento(puerto, direccion, baudrate, timeout) → objeto con
+    read_registers(registro, cantidad, functioncode=...); por defecto un
+    minimalmodbus.Instrument en RTU.
+    """
+
+    def __init__(
+        self,
+        ruta_cache=RUTA_CACHE,
+        baudios=BAUDIOS,
+        direcciones=DIRECCIONES,
+        timeout=TIMEOUT_SONDEO,
+        crear_instrumento=None
+    ):
+        self.ruta_cache  = ruta_cache
+        self.baudios     = tuple(baudios)
+        self.direcciones = tuple(direcciones)
+        self.timeout     = timeout
+        self.crear_instrumento = crear_instrumento or (_instrumento_rtu if MODBUS_DISPONIBLE else None)
+        self.sondeos     = 0   # peticiones enviadas en el último descubrir()
+        self._lock       = threading.Lock()
+
+    # ---------- SONDEO ----------
+    def identificar(self, puerto, direccion, baudrate) -> list[str] | None:
+        """Tipos cuya firma encaja, [] si responde pero no encaja ninguno, None si no responde."""
+        inst = self.crear_instrumento(puerto, direccion, baudrate, self.timeout)
+        tipos, responde = [], False
+        for tipo, firma in FIRMAS.items():
+            with self._lock:
+                self.sondeos += 1
+            try:
+                with bloqueo_bus(puerto):
+                    regs = inst.read_registers(firma["registro"], firma["cantidad"],
+                                               functioncode=firma["funcion"])
+            except ErrorEsclavo:
+                responde = True
+                continue
+            except Exception:
+                # Muchas sondas callan ante registros que no tienen: probar las demás firmas
+                continue
+            responde = True
+            if all(lo <= _con_signo(v) <= hi for v, (lo, hi) in zip(regs, firma["rangos"])):
+                tipos.append(tipo)
+        return tipos if responde else None
+
+    def _explorar_puerto(self, puerto, deseados, conocidos) -> list[dict]:
+        """Nodos del puerto: primero los conocidos; barrido solo si faltan dispositivos."""
+        nodos, probados = [], set()
+
+        def probar(direccion, baudrate):
+            if (direccion, baudrate) in probados:
+                return
+            probados.add((direccion, baudrate))
+            tipos = self.identificar(puerto, direccion, baudrate)
+            if tipos:
+                nodos.append({"direccion": direccion, "baudrate": baudrate, "tipos": tipos})
+
+        for d, b in conocidos:
+            probar(d, b)
+        if not _asignar(deseados, nodos)[1]:
+            return nodos
+
+        log.info("Barriendo %s (%d velocidades × %d direcciones)…",
+                 puerto, len(self.baudios), len(self.direcciones))
+        # Velocidades configuradas primero
+        baudios = list(dict.fromkeys([b for _, b in conocidos] + list(self.baudios)))
+        direcciones = list(dict.fromkeys([d for d, _ in conocidos] + list(self.direcciones)))
+        for b in baudios:
+            for d in direcciones:
+                n = len(nodos)
+                probar(d, b)
+                if len(nodos) > n and not _asignar(deseados, nodos)[1]:
+                    return nodos
+        return nodos
+
+    # ---------- INVENTARIO ----------
+    def descubrir(self, inventario: list[dict]) -> list[dict]:
+        """Devuelve una copia del inventario con direcciones/velocidades corregidas."""
+        if self.crear_instrumento is None:
+            log.warning("minimalmodbus no disponible: se omite el descubrimiento Modbus")
+            return inventario
+
+        inventario = copy.deepcopy(inventario)
+        self.sondeos = 0
+
+        # (estación, tipo, cfg) de cada dispositivo Modbus habilitado, por puerto
+        por_puerto = {}
+        for est in inventario:
+            for tipo in TIPOS_MODBUS:
+                cfg = est.get("dispositivos", {}).get(tipo)
+                if cfg is not None:
+                    por_puerto.setdefault(cfg["puerto"], []).append((est["station_id"], tipo, cfg))
+        if not por_puerto:
+            return inventario
+
+        cache = self._cargar_cache()
+        with ThreadPoolExecutor(max_workers=len(por_puerto), thread_name_prefix="descubrimiento") as pool:
+            futuros = {}
+            for puerto, deseados in por_puerto.items():
+                conocidos = [(cfg["direccion"], cfg["baudrate"]) for _, _, cfg in deseados]
+                conocidos += [(n["direccion"], n["baudrate"]) for n in cache.get(puerto, [])]
+                futuros[puerto] = pool.submit(self._explorar_puerto, puerto, deseados,
+                                              list(dict.fromkeys(conocidos)))
+            nodos_por_puerto = {puerto: fut.result() for puerto, fut in futuros.items()}
+
+        for puerto, deseados in por_puerto.items():
+            asignacion, faltan = _asignar(deseados, nodos_por_puerto[puerto])
+            for i, nodo in asignacion.items():
+                sid, tipo, cfg = deseados[i]
+                if (cfg["direccion"], cfg["baudrate"]) != (nodo["direccion"], nodo["baudrate"]):
+                    log.warning("%s de %s encontrado en %s dirección %d a %d baudios "
+                                "(configurado: dirección %d a %d)", tipo, sid, puerto,
+                                nodo["direccion"], nodo["baudrate"], cfg["direccion"], cfg["baudrate"])
+                    cfg["direccion"], cfg["baudrate"] = nodo["direccion"], nodo["baudrate"]
+            for sid, tipo, _ in faltan:
+                log.error("%s de %s no encontrado en %s: quedará en simulación", tipo, sid, puerto)
+
+        cache.update(nodos_por_puerto)
+        self._guardar_cache(cache)
+        log.info("Descubrimiento Modbus: %d peticiones en %d puertos", self.sondeos, len(por_puerto))
+        return inventario
+
+    # ---------- CACHÉ ----------
+    def _cargar_cache(self) -> dict:
+        try:
+            with open(self.ruta_cache, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            log.warning("Caché de descubrimiento ilegible: %s", self.ruta_cache, exc_info=True)
+            return {}
+
+    def _guardar_cache(self, cache: dict) -> None:
+        tmp = f"{self.ruta_cache}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(cache, f, indent=2)
+            os.replace(tmp, self.ruta_cache)
+        except OSError:
+            log.error("No se pudo guardar la caché de descubrimiento", exc_info=True)
+
+
+def _asignar(deseados, nodos):
+    """
+    Reparte los nodos encontrados entre los dispositivos deseados de un puerto.
+    Preferencia: misma dirección y velocidad > misma dirección > nodo con un
+    solo tipo posible > cualquiera del tipo.
+
+    Devuelve ({índice en deseados: nodo}, [deseados sin nodo]).
+    """
+    criterios = (
+        lambda cfg, n: (n["direccion"], n["baudrate"]) == (cfg["direccion"], cfg["baudrate"]),
+        lambda cfg, n: n["direccion"] == cfg["direccion"],
+        lambda cfg, n: len(n["tipos"]) == 1,
+        lambda cfg, n: True,
+    )
+    libres = list(nodos)
+    asignacion = {}
+    pendientes = list(range(len(deseados)))
+    for criterio in criterios:
+        siguen = []
+        for i in pendientes:
+            _, tipo, cfg = deseados[i]
+            nodo = next((n for n in libres if tipo in n["tipos"] and criterio(cfg, n)), None)
+            if nodo is None:
+                siguen.append(i)
+            else:
+                libres.remove(nodo)
+                asignacion[i] = nodo
+        pendientes = siguen
+    return asignacion, [deseados[i] for i in pendientes]
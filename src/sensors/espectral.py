@@ -0,0 +1,170 @@
+# sensors/espectral.py
+"""
+Perfil de adquisición del AS7265x
+---------------------------------
+Define qué canales se leen, con qué tiempo de integración y ganancia,
+si se usa la bombilla y cuántas lecturas rápidas se promedian (ráfaga).
+
+Cada canal es una transacción I²C independiente, así que leer solo los
+canales que necesitan los índices configurados recorta bastante el ciclo.
+"""
+
+import logging
+
+log = logging.getLogger(__name__)
+
+# Campo exportado → letra del método get_calibrated_<letra>()
+CANALES_ESPECTRALES = {
+    "A_410nm": "a", "B_435nm": "b", "C_460nm": "c", "D_485nm": "d",
+    "E_510nm": "e", "F_535nm": "f", "G_560nm": "g", "H_585nm": "h",
+    "R_610nm": "r", "I_645nm": "i", "S_680nm": "s", "J_705nm": "j",
+    "T_730nm": "t", "U_760nm": "u", "V_810nm": "v", "W_860nm": "w",
+    "K_900nm": "k", "L_940nm": "l",
+}
+
+TEMPERATURAS_ESPECTRALES = ("temp_0", "temp_1", "temp_2")
+
+# Canales que usa cada índice de utils/indices.py
+CANALES_POR_INDICE = {
+    "NDVI":  ("W_860nm", "R_610nm"),
+    "GNDVI": ("W_860nm", "E_510nm"),
+    "NDRE":  ("W_860nm", "J_705nm"),
+    "SAVI":  ("W_860nm", "R_610nm"),
+    "EVI":   ("W_860nm", "R_610nm", "C_460nm"),
+    "MCARI": ("F_535nm", "R_610nm", "E_510nm"),
+    "MTVI2": ("L_940nm", "E_510nm", "R_610nm"),
+    "REP":   ("I_645nm", "J_705nm", "R_610nm", "L_940nm"),
+}
+
+# Ganancia nominal → código del registro de configuración
+GANANCIAS = {1: 0b00, 3.7: 0b01, 16: 0b10, 64: 0b11}
+
+# Valores por defecto (equivalentes al comportamiento original)
+TIEMPO_INTEGRACION_MS = 140.0   # 49 ciclos: 2,8 ms × (49 + 1) (valor de fábrica)
+GANANCIA              = 64
+USAR_BULBO            = True
+RAFAGA                = 1       # nº de lecturas promediadas
+
+MS_POR_CICLO = 2.8
+
+
+class PerfilEspectral:
+    """
+    Configuración de una adquisición espectral.
+
+      canales  → lista explícita de campos a leer (None = todos)
+      indices  → alternativa a 'canales': se leen solo los canales
+                 que necesitan esos índices
+      rafaga   → nº de lecturas rápidas que se promedian
+    """
+
+    def __init__(
+        self,
+        tiempo_integracion_ms=TIEMPO_INTEGRACION_MS,
+        ganancia=GANANCIA,
+        usar_bulbo=USAR_BULBO,
+        canales=None,
+        indices=None,
+        leer_temperaturas=True,
+        rafaga=RAFAGA
+    ):
+        if ganancia not in GANANCIAS:
+            raise ValueError(f"Ganancia no soportada: {ganancia} (válidas: {sorted(GANANCIAS)})")
+        if rafaga < 1:
+            raise ValueError("La ráfaga debe ser de al menos 1 lectura")
+
+        self.tiempo_integracion_ms = float(tiempo_integracion_ms)
+        self.ganancia              = ganancia
+        self.usar_bulbo            = usar_bulbo
+        self.leer_temperaturas     = leer_temperaturas
+        self.rafaga                = int(rafaga)
+        self.canales               = self._resolver_canales(canales, indices)
+
+    @staticmethod
+    def _resolver_canales(canales, indices) -> list[str]:
+        if canales is not None and indices is not None:
+            raise ValueError("Indicar 'canales' o 'indices', no ambos")
+
+        if indices is not None:
+            desconocidos = set(indices) - set(CANALES_POR_INDICE)
+            if desconocidos:
+                raise ValueError(f"Índices sin canales conocidos: {sorted(desconocidos)}")
+            necesarios = {c for idx in indices for c in CANALES_POR_INDICE[idx]}
+        elif canales is not None:
+            desconocidos = set(canales) - set(CANALES_ESPECTRALES)
+            if desconocidos:
+                raise ValueError(f"Canales desconocidos: {sorted(desconocidos)}")
+            necesarios = set(canales)
+        else:
+            necesarios = set(CANALES_ESPECTRALES)
+
+        # Mantener el orden de CAMPOS_EXPORT
+        return [c for c in CANALES_ESPECTRALES if c in necesarios]
+
+    @classmethod
+    def desde_dict(cls, cfg: dict | None) -> "PerfilEspectral":
+        """Construye el perfil a partir de un dict de configuración."""
+        return cls(**(cfg or {}))
+
+    @property
+    def ciclos_integracion(self) -> int:
+        # El AS7265x integra 2,8 ms × (ciclos + 1)
+        return max(0, min(255, round(self.tiempo_integracion_ms / MS_POR_CICLO) - 1))
+
+    def campos(self) -> list[str]:
+        """Campos que produce una lectura con este perfil."""
+        if self.leer_temperaturas:
+            return self.canales + list(TEMPERATURAS_ESPECTRALES)
+        return list(self.canales)
+
+    # ---------- HARDWARE ----------
+    def aplicar(self, sensor) -> None:
+        """Programa integración y ganancia en el sensor ya inicializado."""
+        sensor.set_integration_cycles(self.ciclos_integracion)
+        sensor.set_gain(GANANCIAS[self.ganancia])
+        log.info(
+            "Perfil AS7265x: %d ciclos (%.1f ms), ganancia %gx, bulbo=%s, "
+            "ráfaga=%d, canales=%d",
+            self.ciclos_integracion, self.tiempo_integracion_ms, self.ganancia,
+            self.usar_bulbo, self.rafaga, len(self.canales)
+        )
+
+    def medir(self, sensor) -> dict:
+        """
+        Lanza la(s) medida(s) y lee únicamente los canales del perfil.
+        En ráfaga la bombilla se enciende una sola vez para todas las lecturas.
+        """
+        # Una sola lectura de la configuración: aplicar_nivel_salud() puede
+        # cambiarla desde otro hilo y las bombillas deben apagarse igual
+        usar_bulbo = self.usar_bulbo
+        rafaga     = self.rafaga
+        acumulado  = dict.fromkeys(self.canales, 0.0)
+
+        if usar_bulbo and rafaga == 1:
+            sensor.take_measurements_with_bulb()
+            self._acumular(sensor, acumulado)
+        else:
+            if usar_bulbo:
+                for bulbo in range(3):
+                    sensor.enable_bulb(bulbo)
+            try:
+                for _ in range(rafaga):
+                    sensor.take_measurements()
+                    self._acumular(sensor, acumulado)
+            finally:
+                if usar_bulbo:
+                    for bulbo in range(3):
+                        sensor.disable_bulb(bulbo)
+
+        out = {campo: total / rafaga for campo, total in acumulado.items()}
+
+        if self.leer_temperaturas:
+            for i, campo in enumerate(TEMPERATURAS_ESPECTRALES):
+                out[campo] = sensor.get_temperature(i)
+
+        return out
+
+    def _acumular(self, sensor, acumulado: dict) -> None:
+        for campo in self.canales:
+            lectura = getattr(sensor, f"get_calibrated_{CANALES_ESPECTRALES[campo]}")
+            acumulado[campo] += lectura()
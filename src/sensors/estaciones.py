@@ -0,0 +1,278 @@
+# sensors/estaciones.py
+"""
+Varias estaciones en un solo proceso
+------------------------------------
+Carga un inventario JSON con una o más estaciones (cada una con sus
+dispositivos y su intervalo de muestreo) y las ejecuta a la vez:
+
+  • un único hilo planifica todas las adquisiciones (heap de vencimientos)
+  • un pool con un hilo por bus físico realiza las lecturas
+  • las muestras se entregan en serie, desde el hilo planificador
+
+Con un utils.reloj.RelojSimulado no hay pool: las lecturas se hacen en el
+propio bucle y el reloj salta de un vencimiento al siguiente, así que horas
+de muestreo (y del control del ventilador) se reproducen en segundos.
+
+Ejemplo de inventario (ver estaciones.ejemplo.json):
+
+  {"estaciones": [
+     {"station_id": "principal", "intervalo": 10, "ventilador": true,
+      "muestreo": {"luz_min_espectral": 10},
+      "dispositivos": {"meteorologico": {"puerto": "/dev/ttyAMA2", "direccion": 1,
+                                         "baudrate": 4800}, ...}}
+  ]}
+
+"muestreo" activa el muestreo adaptativo (sensors.adaptativo) con esos
+parámetros; sin la clave la estación muestrea a intervalo fijo.
+"""
+
+import heapq
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from sensors.adaptativo import PoliticaMuestreo
+from sensors.manager import GestorSensores, DISPOSITIVOS_POR_DEFECTO, BUS_ESPECTRAL
+from utils.esquema import STATION_ID_POR_DEFECTO
+from utils.reloj import RELOJ_SISTEMA
+
+log = logging.getLogger(__name__)
+
+INTERVALO_POR_DEFECTO = 10  # segundos entre muestras
+
+
+class Estacion:
+    """Un GestorSensores con su propio calendario de muestreo."""
+
+    def __init__(self, station_id, gestor, intervalo=INTERVALO_POR_DEFECTO, ventilador=False,
+                 politica=None):
+        self.station_id = station_id
+        self.gestor     = gestor
+        self.intervalo  = intervalo
+        self.ventilador = ventilador   # True si controla el ventilador local
+        self.politica   = politica     # PoliticaMuestreo, o None = intervalo fijo
+        self.siguiente  = 0.0          # reloj.monotonic() de la próxima lectura
+        self.ultima     = 0.0          # reloj.monotonic() de la última lectura lanzada
+
+        # Lectura espectral 1 de cada N ciclos (0 = nunca); lo ajusta el
+        # recorte de carga por temperatura del host
+        self.cada_n_espectral = 1
+        self.ciclo = 0
+
+    def leer(self) -> dict:
+        """Un ciclo de adquisición de la estación."""
+        self.ciclo += 1
+        omitir = set()
+        if not self.cada_n_espectral or self.ciclo % self.cada_n_espectral:
+            omitir.add("espectral")
+        if self.politica is None:
+            return self.gestor.leer_todo(omitir=omitir)
+
+        datos = self.gestor.leer_todo(omitir=omitir, filtro_espectral=self.politica.leer_espectral)
+        self.politica.actualizar(datos, self.gestor.reloj.monotonic())
+        return datos
+
+    @property
+    def intervalo_actual(self) -> float:
+        return self.politica.intervalo if self.politica is not None else self.intervalo
+
+    def buses(self) -> set[str]:
+        out = set()
+        for nombre, cfg in self.gestor.dispositivos.items():
+            if cfg is None:
+                continue
+            out.add(BUS_ESPECTRAL if nombre == "espectral" else cfg["puerto"])
+        return out
+
+
+def inventario_por_defecto(intervalo=INTERVALO_POR_DEFECTO) -> list[dict]:
+    """Inventario de una sola estación con las constantes de sensors.manager."""
+    return [{
+        "station_id":   STATION_ID_POR_DEFECTO,
+        "intervalo":    intervalo,
+        "ventilador":   True,
+        "muestreo":     {},
+        "dispositivos": DISPOSITIVOS_POR_DEFECTO,
+    }]
+
+
+def cargar_inventario(ruta) -> list[dict]:
+    """Lee y valida el inventario JSON. Lanza ValueError si es incoherente."""
+    with open(ruta, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+
+    estaciones = cfg.get("estaciones") if isinstance(cfg, dict) else None
+    if not estaciones:
+        raise ValueError(f"{ruta}: no define ninguna estación")
+
+    vistos = set()
+    for est in estaciones:
+        sid = est.get("station_id")
+        if not sid:
+            raise ValueError(f"{ruta}: estación sin 'station_id'")
+        if sid in vistos:
+            raise ValueError(f"{ruta}: 'station_id' repetido: {sid}")
+        vistos.add(sid)
+
+        desconocidos = set(est.get("dispositivos", {})) - set(DISPOSITIVOS_POR_DEFECTO)
+        if desconocidos:
+            raise ValueError(f"{ruta}: dispositivos desconocidos en {sid}: {sorted(desconocidos)}")
+
+    if sum(1 for est in estaciones if est.get("ventilador")) > 1:
+        raise ValueError(f"{ruta}: solo una estación puede controlar el ventilador")
+
+    return estaciones
+
+
+def crear_estaciones(inventario: list[dict], reloj=None) -> list[Estacion]:
+    estaciones = []
+    for cfg in inventario:
+        gestor = GestorSensores(
+            dispositivos=cfg.get("dispositivos", {}),
+            station_id=cfg["station_id"],
+            reloj=reloj,
+        )
+        intervalo = cfg.get("intervalo", INTERVALO_POR_DEFECTO)
+        politica = None
+        if cfg.get("muestreo") is not None:
+            muestreo = dict(cfg["muestreo"])
+            if cfg.get("ventilador"):
+                # El ventilador se controla con cada lectura: sin espaciado
+                muestreo.setdefault("intervalo_max", intervalo)
+            politica = PoliticaMuestreo.desde_dict(intervalo, muestreo, cfg["station_id"])
+        estaciones.append(Estacion(
+            cfg["station_id"], gestor,
+            intervalo=intervalo,
+            ventilador=cfg.get("ventilador", False),
+            politica=politica,
+        ))
+    return estaciones
+
+
+class EjecutorEstaciones:
+    """
+    Ejecuta todas las estaciones del proceso.
+
+    al_recibir_muestra(estacion, datos) se llama en serie (nunca en paralelo),
+    así que los consumidores no necesitan ser thread-safe.
+    """
+
+    def __init__(self, estaciones: list[Estacion], al_recibir_muestra, reloj=None):
+        self.estaciones = estaciones
+        self.al_recibir_muestra = al_recibir_muestra
+        self.reloj = reloj or RELOJ_SISTEMA
+        self._detener = threading.Event()
+
+        # Un hilo por bus: más estaciones en el mismo bus no añaden hilos
+        self._pool = None
+        if not self.reloj.simulado:
+            buses = set().union(*(e.buses() for e in estaciones)) if estaciones else set()
+            self._pool = ThreadPoolExecutor(
+                max_workers=max(1, len(buses)), thread_name_prefix="adquisicion"
+            )
+
+    def detener(self) -> None:
+        self._detener.set()
+
+    def ejecutar(self, hasta: float | None = None) -> None:
+        """
+        Bucle principal. Bloquea hasta detener(), KeyboardInterrupt o, si se
+        indica, hasta que reloj.monotonic() alcance 'hasta'.
+        """
+        ahora = self.reloj.monotonic()
+        cola = []
+        for i, est in enumerate(self.estaciones):
+            est.siguiente = ahora
+            heapq.heappush(cola, (est.siguiente, i))
+
+        if self.reloj.simulado:
+            self._ejecutar_simulado(cola, hasta)
+            return
+
+        en_curso = {}   # future → índice de estación
+        try:
+            while not self._detener.is_set():
+                ahora = self.reloj.monotonic()
+                if hasta is not None and ahora >= hasta:
+                    break
+
+                # Lanzar las adquisiciones vencidas
+                while cola and cola[0][0] <= ahora:
+                    instante, i = heapq.heappop(cola)
+                    est = self.estaciones[i]
+                    if instante != est.siguiente:
+                        continue    # entrada sustituida por _adelantar()
+                    if i in en_curso.values():
+                        log.warning("Estación %s: lectura anterior sin terminar, se omite un ciclo",
+                                    est.station_id)
+                    else:
+                        en_curso[self._pool.submit(est.leer)] = i
+                        est.ultima = ahora
+                    # Ritmo fijo; si vamos con retraso no se acumulan ciclos
+                    est.siguiente = max(est.siguiente + est.intervalo_actual, ahora)
+                    heapq.heappush(cola, (est.siguiente, i))
+
+                espera = max(0.0, cola[0][0] - self.reloj.monotonic()) if cola else None
+                if hasta is not None:
+                    espera = min(espera, hasta - ahora) if espera is not None else hasta - ahora
+
+                if not en_curso:
+                    self._detener.wait(espera)
+                    continue
+
+                hechos, _ = wait(list(en_curso), timeout=espera, return_when=FIRST_COMPLETED)
+                for fut in hechos:
+                    i = en_curso.pop(fut)
+                    est = self.estaciones[i]
+                    try:
+                        datos = fut.result()
+                    except Exception:
+                        log.error("Error adquiriendo estación %s", est.station_id, exc_info=True)
+                        continue
+                    self._adelantar(cola, i)
+                    try:
+                        self.al_recibir_muestra(est, datos)
+                    except Exception:
+                        log.error("Error procesando muestra de %s", est.station_id, exc_info=True)
+        finally:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def _ejecutar_simulado(self, cola, hasta) -> None:
+        """Lecturas en el propio hilo; el reloj salta al siguiente vencimiento."""
+        while cola and not self._detener.is_set():
+            instante, i = cola[0]
+            if hasta is not None and instante >= hasta:
+                self.reloj.dormir(max(0.0, hasta - self.reloj.monotonic()))
+                return
+            self.reloj.dormir(max(0.0, instante - self.reloj.monotonic()))
+            heapq.heappop(cola)
+
+            est = self.estaciones[i]
+            if instante != est.siguiente:
+                continue
+            est.ultima = self.reloj.monotonic()
+            est.siguiente = max(est.siguiente + est.intervalo_actual, est.ultima)
+            heapq.heappush(cola, (est.siguiente, i))
+            try:
+                datos = est.leer()
+            except Exception:
+                log.error("Error adquiriendo estación %s", est.station_id, exc_info=True)
+                continue
+            self._adelantar(cola, i)
+            try:
+                self.al_recibir_muestra(est, datos)
+            except Exception:
+                log.error("Error procesando muestra de %s", est.station_id, exc_info=True)
+
+    def _adelantar(self, cola, i) -> None:
+        """Si la política acortó el intervalo, adelanta la próxima lectura ya programada."""
+        est = self.estaciones[i]
+        antes = est.ultima + est.intervalo_actual
+        if antes < est.siguiente:
+            est.siguiente = max(antes, self.reloj.monotonic())
+            heapq.heappush(cola, (est.siguiente, i))
+
+    def cleanup(self) -> None:
+        for est in self.estaciones:
+            est.gestor.cleanup()
@@ -5,11 +5,15 @@ GestorSensores
 Versión modular de tu clase original EscadaFinal.py.
 """
 
-import time, logging, os
+import logging, os, threading
 from pathlib import Path
 
 import numpy as np
 
+from sensors.espectral import PerfilEspectral, CANALES_POR_INDICE
+from utils.esquema import STATION_ID_POR_DEFECTO
+from utils.reloj import RELOJ_SISTEMA
+
 # ---------- LOG ----------
 log = logging.getLogger(__name__)
 
@@ -40,9 +44,97 @@ PUERTO_XY_MD04   = "/dev/ttyAMA4"
 DIRECCION_XY_MD04 = 5
 BAUDRATE_XY_MD04  = 9600
 
+TIMEOUT_MODBUS = 2  # s
+
+# Bus I²C del AS7265x (solo se usa para serializar accesos entre estaciones)
+BUS_ESPECTRAL = "i2c-1"
+
+# ---------- INVENTARIO DE DISPOSITIVOS ----------
+# Una estación = un dict como este. Un dispositivo a None queda deshabilitado
+# (ni se inicializa ni se simula). "espectral" lleva el perfil de adquisición.
+DISPOSITIVOS_POR_DEFECTO = {
+    "meteorologico": {"puerto": PUERTO_METEOROLOGICO, "direccion": DIRECCION_METEOROLOGICO,
+                      "baudrate": BAUDRATE_METEOROLOGICO},
+    "suelo":         {"puerto": PUERTO_SUELO, "direccion": DIRECCION_SUELO,
+                      "baudrate": BAUDRATE_SUELO},
+    "xy_md04":       {"puerto": PUERTO_XY_MD04, "direccion": DIRECCION_XY_MD04,
+                      "baudrate": BAUDRATE_XY_MD04},
+    "espectral":     {},
+}
+
+# Un cerrojo por bus físico, compartido por todas las estaciones del proceso:
+# dos estaciones en el mismo puerto RS-485 no pueden hablar a la vez.
+_BLOQUEOS_BUS = {}
+_BLOQUEOS_BUS_LOCK = threading.Lock()
+
+
+def bloqueo_bus(bus: str) -> threading.RLock:
+    with _BLOQUEOS_BUS_LOCK:
+        if bus not in _BLOQUEOS_BUS:
+            _BLOQUEOS_BUS[bus] = threading.RLock()
+        return _BLOQUEOS_BUS[bus]
+
+def configurar_serie(inst, cfg: dict) -> None:
+    """
+    minimalmodbus comparte un único serial.Serial por puerto: antes de cada
+    transacción (dentro de bloqueo_bus) se fija la velocidad de ESTE esclavo,
+    por si otro del mismo bus usa otra.
+    """
+    if inst.serial.baudrate != cfg["baudrate"]:
+        inst.serial.baudrate = cfg["baudrate"]
+    if inst.serial.timeout != TIMEOUT_MODBUS:
+        inst.serial.timeout = TIMEOUT_MODBUS
+
+# Rangos de simulación del AS7265x (cuando no hay sensor físico)
+SIMULACION_ESPECTRAL = {
+    "A_410nm": (10, 100),
+    "B_435nm": (50, 200),
+    "C_460nm": (100, 1000),
+    "D_485nm": (50, 300),
+    "E_510nm": (200, 1500),
+    "F_535nm": (500, 2500),
+    "G_560nm": (400, 2200),
+    "H_585nm": (200, 1200),
+    "R_610nm": (100, 500),
+    "I_645nm": (50, 150),
+    "S_680nm": (200, 1300),
+    "J_705nm": (80, 400),
+    "T_730nm": (30, 100),
+    "U_760nm": (50, 150),
+    "V_810nm": (100, 300),
+    "W_860nm": (90, 250),
+    "K_900nm": (20, 80),
+    "L_940nm": (10, 50),
+    "temp_0":  (20, 30),
+    "temp_1":  (20, 30),
+    "temp_2":  (20, 30),
+}
+
 # ---------- CLASE PRINCIPAL ----------
 class GestorSensores:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        perfil_espectral: PerfilEspectral | None = None,
+        dispositivos: dict | None = None,
+        station_id: str = STATION_ID_POR_DEFECTO,
+        reloj=None
+    ) -> None:
+        # Identificador con el que se etiqueta cada muestra
+        self.station_id = station_id
+
+        # Reloj de las esperas entre reintentos (utils.reloj)
+        self.reloj = reloj or RELOJ_SISTEMA
+
+        # Inventario de dispositivos (por defecto: las constantes de este módulo)
+        if dispositivos is None:
+            dispositivos = DISPOSITIVOS_POR_DEFECTO
+        self.dispositivos = {nombre: dispositivos.get(nombre) for nombre in DISPOSITIVOS_POR_DEFECTO}
+
+        # Perfil de adquisición espectral (por defecto: todos los canales, con bulbo)
+        if perfil_espectral is None:
+            perfil_espectral = PerfilEspectral.desde_dict(self.dispositivos["espectral"])
+        self.perfil_espectral = perfil_espectral
+
         # Instancias de bajo nivel
         self.sensor_meteorologico = None
         self.sensor_suelo         = None
@@ -60,7 +152,7 @@ class GestorSensores:
         self.info_conexion_espectral     = {"conectado": False, "version": "N/A", "error": None}
 
         log.info("=" * 60)
-        log.info("INICIALIZANDO SISTEMA DE SENSORES")
+        log.info(f"INICIALIZANDO SISTEMA DE SENSORES ({self.station_id})")
         log.info("=" * 60)
 
         self.inicializar_sensores()
@@ -81,6 +173,10 @@ class GestorSensores:
 
     # ---------- INICIALIZACIÓN ESPECTRAL ----------
     def inicializar_sensor_espectral(self) -> bool:
+        if self.dispositivos["espectral"] is None:
+            self.info_conexion_espectral["error"] = "deshabilitado"
+            return False
+
         if not SENSOR_ESPECTRAL_DISPONIBLE:
             log.error("Librería qwiic_as7265x no disponible – modo simulación")
             self.info_conexion_espectral = {"conectado": False, "version": "N/A",
@@ -91,21 +187,23 @@ class GestorSensores:
             try:
                 log.info(f"Inicializando AS7265x (intento {intento+1})…")
                 self.sensor_espectral = qwiic_as7265x.QwiicAS7265x()
-                if not self.sensor_espectral.is_connected():
-                    msg = "AS7265x no detectado en el bus I²C"
-                    log.error(msg)
-                    continue
-
-                if not self.sensor_espectral.begin():
-                    msg = "AS7265x no responde al comando begin()"
-                    log.error(msg)
-                    continue
-
-                tipo  = self.sensor_espectral.get_device_type()
-                v_hw  = self.sensor_espectral.get_hardware_version()
-                v_fw  = self.sensor_espectral.get_major_firmware_version()
-                ver   = f"HW:{v_hw} FW:{v_fw}"
-                log.info(f"Sensor AS7265x listo – {ver}")
+                with bloqueo_bus(BUS_ESPECTRAL):
+                    if not self.sensor_espectral.is_connected():
+                        msg = "AS7265x no detectado en el bus I²C"
+                        log.error(msg)
+                        continue
+
+                    if not self.sensor_espectral.begin():
+                        msg = "AS7265x no responde al comando begin()"
+                        log.error(msg)
+                        continue
+
+                    tipo  = self.sensor_espectral.get_device_type()
+                    v_hw  = self.sensor_espectral.get_hardware_version()
+                    v_fw  = self.sensor_espectral.get_major_firmware_version()
+                    ver   = f"HW:{v_hw} FW:{v_fw}"
+                    log.info(f"Sensor AS7265x listo – {ver}")
+                    self.perfil_espectral.aplicar(self.sensor_espectral)
 
                 self.info_conexion_espectral = {"conectado": True, "version": ver, "error": None}
                 self.reintentos_espectral = 0
@@ -114,7 +212,7 @@ class GestorSensores:
             except Exception as e:
                 log.error("Error inicializando sensor espectral", exc_info=True)
 
-            time.sleep(2)
+            self.reloj.dormir(2)
 
         self.sensor_espectral = None
         self.info_conexion_espectral = {"conectado": False, "version": "N/A",
@@ -124,15 +222,18 @@ class GestorSensores:
     # ---------- INICIALIZAR TODOS LOS SENSORES ----------
     def inicializar_sensores(self) -> None:
         # ---- METEORO ----
-        if MODBUS_DISPONIBLE:
+        cfg = self.dispositivos["meteorologico"]
+        if cfg is None:
+            self.info_conexion_meteorologico["error"] = "deshabilitado"
+        elif MODBUS_DISPONIBLE:
             try:
                 log.info("Inicializando estación meteorológica…")
-                inst = minimalmodbus.Instrument(PUERTO_METEOROLOGICO, DIRECCION_METEOROLOGICO)
-                inst.serial.baudrate  = BAUDRATE_METEOROLOGICO
-                inst.serial.timeout   = 2
+                inst = minimalmodbus.Instrument(cfg["puerto"], cfg["direccion"])
                 inst.mode = minimalmodbus.MODE_RTU
                 # lectura test
-                inst.read_register(0x01F9, 0, signed=True)
+                with bloqueo_bus(cfg["puerto"]):
+                    configurar_serie(inst, cfg)
+                    inst.read_register(0x01F9, 0, signed=True)
                 self.sensor_meteorologico = inst
                 self.info_conexion_meteorologico = {"conectado": True, "version": "Modbus RTU", "error": None}
                 log.info("✅ Estación meteorológica conectada")
@@ -143,14 +244,17 @@ class GestorSensores:
             log.error("minimalmodbus NO disponible – sensores en modo simulación")
 
         # ---- SUELO ----
-        if MODBUS_DISPONIBLE:
+        cfg = self.dispositivos["suelo"]
+        if cfg is None:
+            self.info_conexion_suelo["error"] = "deshabilitado"
+        elif MODBUS_DISPONIBLE:
             try:
                 log.info("Inicializando sensor de suelo…")
-                inst = minimalmodbus.Instrument(PUERTO_SUELO, DIRECCION_SUELO)
-                inst.serial.baudrate = BAUDRATE_SUELO
-                inst.serial.timeout  = 2
+                inst = minimalmodbus.Instrument(cfg["puerto"], cfg["direccion"])
                 inst.mode = minimalmodbus.MODE_RTU
-                inst.read_register(0x0000, 0)
+                with bloqueo_bus(cfg["puerto"]):
+                    configurar_serie(inst, cfg)
+                    inst.read_register(0x0000, 0)
                 self.sensor_suelo = inst
                 self.info_conexion_suelo = {"conectado": True, "version": "Modbus RTU", "error": None}
                 log.info("✅ Sensor de suelo conectado")
@@ -159,14 +263,17 @@ class GestorSensores:
                 self.info_conexion_suelo["error"] = str(e)
 
         # ---- XY-MD04 ----
-        if MODBUS_DISPONIBLE:
+        cfg = self.dispositivos["xy_md04"]
+        if cfg is None:
+            self.info_conexion_xy_md04["error"] = "deshabilitado"
+        elif MODBUS_DISPONIBLE:
             try:
                 log.info("Inicializando sensor XY-MD04…")
-                inst = minimalmodbus.Instrument(PUERTO_XY_MD04, DIRECCION_XY_MD04)
-                inst.serial.baudrate = BAUDRATE_XY_MD04
-                inst.serial.timeout  = 2
+                inst = minimalmodbus.Instrument(cfg["puerto"], cfg["direccion"])
                 inst.mode = minimalmodbus.MODE_RTU
-                inst.read_registers(0x0001, 2, functioncode=4)
+                with bloqueo_bus(cfg["puerto"]):
+                    configurar_serie(inst, cfg)
+                    inst.read_registers(0x0001, 2, functioncode=4)
                 self.sensor_xy_md04 = inst
                 self.info_conexion_xy_md04 = {"conectado": True, "version": "Modbus RTU", "error": None}
                 log.info("✅ Sensor XY-MD04 conectado")
@@ -197,17 +304,19 @@ class GestorSensores:
             }
 
         try:
-            return {
-                "direccion_viento":      self.sensor_meteorologico.read_register(0x01F7, 0),
-                "velocidad_viento_prom": self.sensor_meteorologico.read_register(0x01F4, 0) / 100,
-                "velocidad_viento_max":  self.sensor_meteorologico.read_register(0x01F5, 0) / 100,
-                "temperatura":           self.sensor_meteorologico.read_register(0x01F9, 0, signed=True) / 10,
-                "humedad":               self.sensor_meteorologico.read_register(0x01F8, 0) / 10,
-                "presion":               self.sensor_meteorologico.read_register(0x01FD, 0),
-                "luz":                   self.sensor_meteorologico.read_register(0x0200, 0),
-                "indice_uv":             self.sensor_meteorologico.read_register(0x01FE, 0) / 10,
-                "lluvia":                self.sensor_meteorologico.read_register(0x0201, 0) / 10,
-            }
+            with bloqueo_bus(self.dispositivos["meteorologico"]["puerto"]):
+                configurar_serie(self.sensor_meteorologico, self.dispositivos["meteorologico"])
+                return {
+                    "direccion_viento":      self.sensor_meteorologico.read_register(0x01F7, 0),
+                    "velocidad_viento_prom": self.sensor_meteorologico.read_register(0x01F4, 0) / 100,
+                    "velocidad_viento_max":  self.sensor_meteorologico.read_register(0x01F5, 0) / 100,
+                    "temperatura":           self.sensor_meteorologico.read_register(0x01F9, 0, signed=True) / 10,
+                    "humedad":               self.sensor_meteorologico.read_register(0x01F8, 0) / 10,
+                    "presion":               self.sensor_meteorologico.read_register(0x01FD, 0),
+                    "luz":                   self.sensor_meteorologico.read_register(0x0200, 0),
+                    "indice_uv":             self.sensor_meteorologico.read_register(0x01FE, 0) / 10,
+                    "lluvia":                self.sensor_meteorologico.read_register(0x0201, 0) / 10,
+                }
         except Exception as e:
             log.error("Error leyendo estación meteorológica", exc_info=True)
             return {}
@@ -223,12 +332,14 @@ class GestorSensores:
             }
 
         try:
-            return {
-                "humedad_suelo":      self.sensor_suelo.read_register(0x0000, 0) / 10,
-                "temperatura_suelo":  self.sensor_suelo.read_register(0x0001, 0, signed=True) / 10,
-                "conductividad_suelo": self.sensor_suelo.read_register(0x0002, 0),
-                "ph_suelo":           self.sensor_suelo.read_register(0x0003, 0) / 10,
-            }
+            with bloqueo_bus(self.dispositivos["suelo"]["puerto"]):
+                configurar_serie(self.sensor_suelo, self.dispositivos["suelo"])
+                return {
+                    "humedad_suelo":      self.sensor_suelo.read_register(0x0000, 0) / 10,
+                    "temperatura_suelo":  self.sensor_suelo.read_register(0x0001, 0, signed=True) / 10,
+                    "conductividad_suelo": self.sensor_suelo.read_register(0x0002, 0),
+                    "ph_suelo":           self.sensor_suelo.read_register(0x0003, 0) / 10,
+                }
         except Exception as e:
             log.error("Error leyendo sensor de suelo", exc_info=True)
             return {}
@@ -242,7 +353,9 @@ class GestorSensores:
             }
 
         try:
-            regs = self.sensor_xy_md04.read_registers(0x0001, 2, functioncode=4)
+            with bloqueo_bus(self.dispositivos["xy_md04"]["puerto"]):
+                configurar_serie(self.sensor_xy_md04, self.dispositivos["xy_md04"])
+                regs = self.sensor_xy_md04.read_registers(0x0001, 2, functioncode=4)
             return {
                 "temperatura_armario": regs[0] / 10.0,
                 "humedad_armario":     regs[1] / 10.0,
@@ -254,56 +367,15 @@ class GestorSensores:
     # --- ESPECTRAL AS7265x ---
     def leer_datos_espectrales(self) -> dict:
         if not self.sensor_espectral:
-            # Simulación con valores random
+            # Simulación con valores random (solo los campos del perfil)
             return {
-                "A_410nm": np.random.uniform(10, 100),
-                "B_435nm": np.random.uniform(50, 200),
-                "C_460nm": np.random.uniform(100, 1000),
-                "D_485nm": np.random.uniform(50, 300),
-                "E_510nm": np.random.uniform(200, 1500),
-                "F_535nm": np.random.uniform(500, 2500),
-                "G_560nm": np.random.uniform(400, 2200),
-                "H_585nm": np.random.uniform(200, 1200),
-                "R_610nm": np.random.uniform(100, 500),
-                "I_645nm": np.random.uniform(50, 150),
-                "S_680nm": np.random.uniform(200, 1300),
-                "J_705nm": np.random.uniform(80, 400),
-                "T_730nm": np.random.uniform(30, 100),
-                "U_760nm": np.random.uniform(50, 150),
-                "V_810nm": np.random.uniform(100, 300),
-                "W_860nm": np.random.uniform(90, 250),
-                "K_900nm": np.random.uniform(20, 80),
-                "L_940nm": np.random.uniform(10, 50),
-                "temp_0":  np.random.uniform(20, 30),
-                "temp_1":  np.random.uniform(20, 30),
-                "temp_2":  np.random.uniform(20, 30),
+                campo: np.random.uniform(*SIMULACION_ESPECTRAL[campo])
+                for campo in self.perfil_espectral.campos()
             }
 
         try:
-            self.sensor_espectral.take_measurements_with_bulb()
-            out = {
-                "A_410nm": self.sensor_espectral.get_calibrated_a(),
-                "B_435nm": self.sensor_espectral.get_calibrated_b(),
-                "C_460nm": self.sensor_espectral.get_calibrated_c(),
-                "D_485nm": self.sensor_espectral.get_calibrated_d(),
-                "E_510nm": self.sensor_espectral.get_calibrated_e(),
-                "F_535nm": self.sensor_espectral.get_calibrated_f(),
-                "G_560nm": self.sensor_espectral.get_calibrated_g(),
-                "H_585nm": self.sensor_espectral.get_calibrated_h(),
-                "R_610nm": self.sensor_espectral.get_calibrated_r(),
-                "I_645nm": self.sensor_espectral.get_calibrated_i(),
-                "S_680nm": self.sensor_espectral.get_calibrated_s(),
-                "J_705nm": self.sensor_espectral.get_calibrated_j(),
-                "T_730nm": self.sensor_espectral.get_calibrated_t(),
-                "U_760nm": self.sensor_espectral.get_calibrated_u(),
-                "V_810nm": self.sensor_espectral.get_calibrated_v(),
-                "W_860nm": self.sensor_espectral.get_calibrated_w(),
-                "K_900nm": self.sensor_espectral.get_calibrated_k(),
-                "L_940nm": self.sensor_espectral.get_calibrated_l(),
-                "temp_0":  self.sensor_espectral.get_temperature(0),
-                "temp_1":  self.sensor_espectral.get_temperature(1),
-                "temp_2":  self.sensor_espectral.get_temperature(2),
-            }
+            with bloqueo_bus(BUS_ESPECTRAL):
+                out = self.perfil_espectral.medir(self.sensor_espectral)
             self.reintentos_espectral = 0
             return out
 
@@ -332,14 +404,25 @@ class GestorSensores:
         except Exception as e:
             log.error("Error durante cleanup", exc_info=True)
     
-    def leer_todo(self):
-        datos = {}
-
-        # Lecturas principales
-        datos_meteo = self.leer_datos_meteorologicos()
-        datos_suelo = self.leer_datos_suelo()
-        datos_xy = self.leer_datos_xy_md04()
-        datos_espectrales = self.leer_datos_espectrales()
+    def leer_todo(self, omitir=(), filtro_espectral=None):
+        """
+        Lee todos los dispositivos habilitados salvo los de 'omitir'
+        (nombres de DISPOSITIVOS_POR_DEFECTO, p. ej. {"espectral"}).
+
+        filtro_espectral(datos) → False para no leer el espectral; recibe lo
+        ya leído en este ciclo (p. ej. la luz del meteorológico).
+        """
+        datos = {"station_id": self.station_id}
+
+        # Lecturas principales (los dispositivos deshabilitados u omitidos no se leen)
+        habilitado = {nombre: cfg is not None and nombre not in omitir
+                      for nombre, cfg in self.dispositivos.items()}
+        datos_meteo = self.leer_datos_meteorologicos() if habilitado["meteorologico"] else {}
+        datos_suelo = self.leer_datos_suelo() if habilitado["suelo"] else {}
+        datos_xy = self.leer_datos_xy_md04() if habilitado["xy_md04"] else {}
+        if habilitado["espectral"] and filtro_espectral is not None:
+            habilitado["espectral"] = filtro_espectral({**datos_meteo, **datos_suelo, **datos_xy})
+        datos_espectrales = self.leer_datos_espectrales() if habilitado["espectral"] else {}
 
         if datos_meteo:
             datos.update(datos_meteo)
@@ -350,23 +433,17 @@ class GestorSensores:
         if datos_espectrales:
             datos.update(datos_espectrales)
 
-        return datos
-
-
         # Cálculo de índices espectrales
         try:
             from utils.indices import calcular_indices
             indices = calcular_indices(datos)
+            # Descartar índices cuyos canales no se han leído (saldrían con ceros)
+            for indice, canales in CANALES_POR_INDICE.items():
+                if not all(c in datos for c in canales):
+                    indices.pop(indice, None)
             datos.update(indices)
         except Exception as e:
             from logging import getLogger
             getLogger("sensors.manager").warning(f"No se calcularon índices: {e}")
 
-        # Añadir temperatura CPU Raspberry Pi
-        from utils.temp_cpu import obtener_temperatura_cpu
-        temp_cpu = obtener_temperatura_cpu()
-        if temp_cpu is not None:
-            datos["temperatura_cpu"] = round(temp_cpu, 2)
-
         return datos
-
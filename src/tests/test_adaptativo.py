@@ -0,0 +1,100 @@
+import pytest
+
+from sensors.adaptativo import PoliticaMuestreo
+from sensors.estaciones import EjecutorEstaciones, Estacion, crear_estaciones
+from utils.reloj import RelojSimulado
+
+
+def test_espectral_omitido_sin_luz():
+    p = PoliticaMuestreo(10, luz_min_espectral=10)
+    assert p.leer_espectral({"luz": 0}) is False
+    assert p.leer_espectral({"luz": 800}) is True
+    # Sin meteorológico en el ciclo: vale la última luz conocida
+    p.leer_espectral({"luz": 3})
+    assert p.leer_espectral({}) is False
+    assert p.contadores["espectral_omitido"] == 3
+
+
+def test_gestor_no_lee_espectral_de_noche():
+    est, = crear_estaciones([{
+        "station_id": "noche", "muestreo": {"luz_min_espectral": 10 ** 9},
+        "dispositivos": {"meteorologico": {"puerto": "/dev/null", "direccion": 1,
+                                           "baudrate": 4800}, "espectral": {}},
+    }])
+    datos = est.leer()
+    assert "luz" in datos
+    assert "W_860nm" not in datos and "NDVI" not in datos
+
+
+def test_acelera_con_cambio_rapido_y_espacia_si_estable():
+    p = PoliticaMuestreo(10, tasas_max={"temperatura": 0.1}, ciclos_estable=3, intervalo_max=40)
+    t = 0
+    for _ in range(4):
+        p.actualizar({"temperatura": 20.0}, t)
+        t += 10
+    assert p.intervalo == 20            # 3 ciclos estables → ×2
+
+    p.actualizar({"temperatura": 25.0}, t)   # 0,5 °C/s > 0,1
+    assert p.intervalo == 2.5
+
+    p.actualizar({"temperatura": 25.5}, t + 2.5)   # 0,2 °C/s: sigue rápido
+    assert p.intervalo == 2.5
+    p.actualizar({"temperatura": 25.6}, t + 5)     # 0,04 °C/s: normal
+    assert p.intervalo == 10
+
+
+def test_factores_invalidos():
+    with pytest.raises(ValueError):
+        PoliticaMuestreo(10, factor_rapido=2)
+
+
+class GestorFalso:
+    """Temperatura plana salvo una rampa rápida entre t=600 y t=660."""
+
+    def __init__(self, reloj):
+        self.reloj = reloj
+        self.dispositivos = {}
+
+    def leer_todo(self, omitir=(), filtro_espectral=None):
+        t = self.reloj.monotonic()
+        return {"temperatura": 20 + min(max(t - 600, 0), 60) / 10}
+
+    def cleanup(self):
+        pass
+
+
+def test_ejecutor_adelanta_la_lectura_al_acelerar():
+    reloj = RelojSimulado()
+    politica = PoliticaMuestreo(10, tasas_max={"temperatura": 0.05}, ciclos_estable=6,
+                                intervalo_max=60)
+    est = Estacion("falsa", GestorFalso(reloj), intervalo=10, politica=politica)
+    instantes = []
+    EjecutorEstaciones([est], lambda e, d: instantes.append(reloj.monotonic()),
+                       reloj=reloj).ejecutar(hasta=700)
+
+    antes = [b - a for a, b in zip(instantes, instantes[1:]) if b <= 600]
+    durante = [b - a for a, b in zip(instantes, instantes[1:]) if 620 < a and b <= 660]
+    assert max(antes) > 10              # espaciado mientras estaba estable
+    assert durante and set(durante) == {2.5}
+
+
+def test_estacion_con_ventilador_no_espacia_lecturas():
+    est, = crear_estaciones([{"station_id": "armario", "intervalo": 10, "ventilador": True,
+                              "muestreo": {}, "dispositivos": {}}])
+    assert est.politica.intervalo_max == 10
+    for t in range(0, 200, 10):
+        est.politica.actualizar({"temperatura_armario": 25.0}, t)
+    assert est.politica.intervalo == 10
+    # Un cambio rápido en el armario sí acelera
+    est.politica.actualizar({"temperatura_armario": 28.0}, 200)
+    assert est.politica.intervalo < 10
+
+
+def test_ruido_de_cuantizacion_no_acorta_el_intervalo():
+    # XY-MD04 y barómetro oscilando un paso de resolución con la política por defecto
+    p = PoliticaMuestreo(10, intervalo_max=10)
+    for i in range(30):
+        p.actualizar({"temperatura_armario": 25.0 + 0.1 * (i % 2),
+                      "presion": 1013 + i % 2}, 10 * i)
+        assert p.intervalo == 10
+    assert p.contadores["acelerado"] == 0
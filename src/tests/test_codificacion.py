@@ -0,0 +1,115 @@
+import json
+
+import pytest
+import requests
+
+from utils.codificacion import (
+    CodificadorTelemetria, DecodificadorTelemetria, ErrorTrama, ESCALAS_V1
+)
+from utils.generador_carga import muestra_sintetica
+from utils.servidor_ingesta import ServidorIngesta
+from utils.tb_client import publish_telemetry_binaria
+
+
+def muestra(**extra):
+    m = muestra_sintetica("principal")
+    m["timestamp"] = 1_750_000_000
+    m["git_commit"] = "3a48fda"
+    m.update(extra)
+    return m
+
+
+def assert_equivalente(original, decodificada):
+    for campo, escala in ESCALAS_V1.items():
+        if campo not in original:
+            continue
+        if escala is None:
+            assert decodificada[campo] == original[campo]
+        else:
+            assert decodificada[campo] == pytest.approx(original[campo], abs=0.5 / escala)
+
+
+def test_ida_y_vuelta_completa_y_delta():
+    cod = CodificadorTelemetria("principal")
+    dec = DecodificadorTelemetria()
+    for i in range(5):
+        m = muestra(timestamp=1_750_000_000 + 10 * i)
+        d = dec.decodificar(cod.codificar(m))
+        assert d["station_id"] == "principal"
+        assert_equivalente(m, d)
+
+
+def test_campos_ausentes_y_no_numericos():
+    cod = CodificadorTelemetria("a", delta=False)
+    m = {"timestamp": 1, "temperatura": 21.3, "humedad": "--", "ph_suelo": float("nan")}
+    d = DecodificadorTelemetria().decodificar(cod.codificar(m))
+    assert d == {"station_id": "a", "timestamp": 1, "temperatura": 21.3}
+
+
+def test_tamano_frente_a_json():
+    m = muestra()
+    tam_json = len(json.dumps(m).encode())
+    cod = CodificadorTelemetria("principal")
+    completa = cod.codificar(m)
+    delta = cod.codificar(muestra(timestamp=1_750_000_010))
+
+    assert tam_json / len(completa) >= 5
+    assert len(delta) <= len(completa)
+
+
+def test_delta_sin_referencia_se_rechaza_hasta_trama_completa():
+    cod = CodificadorTelemetria("a")
+    dec = DecodificadorTelemetria()
+    dec.decodificar(cod.codificar(muestra()))
+    cod.codificar(muestra())             # trama perdida
+    with pytest.raises(ErrorTrama):
+        dec.decodificar(cod.codificar(muestra()))
+
+    cod.forzar_clave()
+    m = muestra()
+    assert_equivalente(m, dec.decodificar(cod.codificar(m)))
+
+
+def test_trama_corrupta():
+    with pytest.raises(ErrorTrama):
+        DecodificadorTelemetria().decodificar(b"\x00\x01\x01\x00")
+
+
+def tramas_corruptas():
+    buena = CodificadorTelemetria("a", delta=False).codificar(muestra())
+    assert buena.endswith(b"3a48fda")
+    return [
+        b"\xb7\x01\x01\x00\x02\xff\xfe\x00",          # station_id no UTF-8
+        b"\xb7\x01\x01\x00\x05ab",                      # station_id más largo que la trama
+        buena[:-7] + b"\xff\xfe\xfd\xfc\xfb\xfa\xf9",   # git_commit no UTF-8
+        buena[:-1],                                       # git_commit truncado
+    ]
+
+
+@pytest.mark.parametrize("trama", tramas_corruptas())
+def test_texto_corrupto_es_error_de_trama(trama):
+    with pytest.raises(ErrorTrama):
+        DecodificadorTelemetria().decodificar(trama)
+
+
+def test_endpoint_binario_rechaza_trama_corrupta():
+    srv = ServidorIngesta().iniciar()
+    try:
+        for trama in tramas_corruptas():
+            r = requests.post(f"{srv.url}/datos/bin", data=trama, timeout=5)
+            assert r.status_code == 422
+        assert srv.estado.contadores["tramas_rechazadas"] == 4
+    finally:
+        srv.detener()
+
+
+def test_endpoint_binario_del_servidor_local():
+    srv = ServidorIngesta().iniciar()
+    try:
+        cod = CodificadorTelemetria("principal")
+        for _ in range(3):
+            assert publish_telemetry_binaria(cod.codificar(muestra()), url=f"{srv.url}/datos")
+        assert srv.estado.contadores["muestras"] == 3
+        assert srv.estado.muestras[-1]["git_commit"] == "3a48fda"
+    finally:
+        srv.detener()
@@ -0,0 +1,132 @@
+import json
+from types import SimpleNamespace
+
+from sensors.descubrimiento import DescubridorModbus, ErrorEsclavo
+from sensors.manager import GestorSensores
+
+
+class BusFalso:
+    """Esclavos por (puerto, dirección, baudios) → {(función, registro): [valores]}."""
+
+    SUELO = {(3, 0x0000): [235, 180, 640, 68]}
+    XY    = {(4, 0x0001): [215, 455]}
+    METEO = {(3, 0x01F8): [550, 0xFFEC]}     # humedad 55 %, temperatura -2 °C
+
+    def __init__(self, esclavos, mudos=()):
+        self.esclavos = esclavos
+        self.mudos = set(mudos)    # esclavos que no contestan a registros que no tienen
+        self.peticiones = 0
+
+    def __call__(self, puerto, direccion, baudrate, timeout):
+        bus = self
+
+        class Instrumento:
+            def read_registers(self, registro, cantidad, functioncode=3):
+                bus.peticiones += 1
+                mapa = bus.esclavos.get((puerto, direccion, baudrate))
+                if mapa is None:
+                    raise OSError("sin respuesta")
+                if (functioncode, registro) not in mapa:
+                    if (puerto, direccion, baudrate) in bus.mudos:
+                        raise OSError("sin respuesta")
+                    raise ErrorEsclavo("registro no soportado")
+                return mapa[(functioncode, registro)][:cantidad]
+
+        return Instrumento()
+
+
+def inventario():
+    return [
+        {"station_id": "principal", "dispositivos": {
+            "meteorologico": {"puerto": "/dev/A", "direccion": 1, "baudrate": 4800},
+            "suelo":         {"puerto": "/dev/B", "direccion": 1, "baudrate": 9600},
+            "xy_md04":       {"puerto": "/dev/B", "direccion": 5, "baudrate": 9600},
+            "espectral":     {},
+        }},
+    ]
+
+
+def test_configuracion_correcta_sin_barrido(tmp_path):
+    bus = BusFalso({("/dev/A", 1, 4800): BusFalso.METEO,
+                    ("/dev/B", 1, 9600): BusFalso.SUELO,
+                    ("/dev/B", 5, 9600): BusFalso.XY})
+    d = DescubridorModbus(tmp_path / "cache.json", crear_instrumento=bus)
+    inv = d.descubrir(inventario())
+    assert inv == inventario()
+    assert bus.peticiones <= 9        # una identificación por dispositivo
+
+
+def test_sonda_cambiada_se_encuentra_y_se_cachea(tmp_path):
+    # El técnico puso una sonda de suelo en la dirección 7 a 4800 baudios
+    bus = BusFalso({("/dev/A", 1, 4800): BusFalso.METEO,
+                    ("/dev/B", 7, 4800): BusFalso.SUELO,
+                    ("/dev/B", 5, 9600): BusFalso.XY})
+    ruta = tmp_path / "cache.json"
+    inv = DescubridorModbus(ruta, direcciones=range(1, 11), crear_instrumento=bus).descubrir(inventario())
+
+    suelo = inv[0]["dispositivos"]["suelo"]
+    assert (suelo["direccion"], suelo["baudrate"]) == (7, 4800)
+    assert inventario()[0]["dispositivos"]["suelo"]["direccion"] == 1   # original intacto
+    cache = json.loads(ruta.read_text())
+    assert {"direccion": 7, "baudrate": 4800, "tipos": ["suelo"]} in cache["/dev/B"]
+
+    # Siguiente arranque: la caché evita el barrido
+    bus.peticiones = 0
+    inv2 = DescubridorModbus(ruta, direcciones=range(1, 11), crear_instrumento=bus).descubrir(inventario())
+    assert inv2 == inv
+    assert bus.peticiones <= 12      # 4 nodos conocidos × 3 firmas, sin barrido
+
+
+def test_sonda_muda_ante_registros_ajenos_se_identifica(tmp_path):
+    # La sonda de suelo no contesta a la firma meteorológica (la primera de FIRMAS)
+    bus = BusFalso({("/dev/A", 1, 4800): BusFalso.METEO,
+                    ("/dev/B", 1, 9600): BusFalso.SUELO,
+                    ("/dev/B", 5, 9600): BusFalso.XY},
+                   mudos={("/dev/B", 1, 9600), ("/dev/B", 5, 9600)})
+    d = DescubridorModbus(tmp_path / "cache.json", direcciones=range(1, 4), crear_instrumento=bus)
+    assert d.identificar("/dev/B", 1, 9600) == ["suelo"]
+    assert d.identificar("/dev/B", 5, 9600) == ["xy_md04"]
+    assert d.identificar("/dev/B", 2, 9600) is None
+    assert d.descubrir(inventario()) == inventario()
+
+
+class EsclavoEnPuerto:
+    """Instrumento que solo contesta si el serial compartido del puerto va a su velocidad."""
+
+    def __init__(self, serie, baudrate, registros):
+        self.serial, self.baudrate, self.registros = serie, baudrate, registros
+
+    def _comprobar(self):
+        if self.serial.baudrate != self.baudrate:
+            raise OSError("sin respuesta")
+
+    def read_register(self, registro, decimales=0, signed=False):
+        self._comprobar()
+        return self.registros[registro]
+
+    def read_registers(self, registro, cantidad, functioncode=3):
+        self._comprobar()
+        return [self.registros[registro + i] for i in range(cantidad)]
+
+
+def test_velocidades_mezcladas_en_un_puerto_se_leen_bien():
+    # Suelo a 4800 y XY-MD04 a 9600 en /dev/B (como tras el descubrimiento):
+    # minimalmodbus comparte un serial por puerto, así que cada lectura fija la suya
+    inv = inventario()[0]["dispositivos"]
+    inv["suelo"].update(direccion=7, baudrate=4800)
+    serie = SimpleNamespace(baudrate=9600, timeout=2)
+
+    g = GestorSensores(dispositivos=inv)
+    g.sensor_suelo = EsclavoEnPuerto(serie, 4800, {0: 235, 1: 180, 2: 640, 3: 68})
+    g.sensor_xy_md04 = EsclavoEnPuerto(serie, 9600, {1: 215, 2: 455})
+
+    for _ in range(2):
+        assert g.leer_datos_suelo()["humedad_suelo"] == 23.5
+        assert g.leer_datos_xy_md04()["temperatura_armario"] == 21.5
+
+
+def test_dispositivo_ausente_conserva_configuracion(tmp_path):
+    bus = BusFalso({("/dev/B", 1, 9600): BusFalso.SUELO, ("/dev/B", 5, 9600): BusFalso.XY})
+    inv = DescubridorModbus(tmp_path / "c.json", direcciones=range(1, 4),
+                            crear_instrumento=bus).descubrir(inventario())
+    assert inv[0]["dispositivos"]["meteorologico"]["direccion"] == 1
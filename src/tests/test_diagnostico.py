@@ -0,0 +1,101 @@
+import os
+import signal
+import threading
+
+import pytest
+
+from utils.diagnostico import Diagnostico
+
+
+def test_inactivo_no_genera_informes(tmp_path):
+    d = Diagnostico(tmp_path, activo=False, cada_n_perfil=1)
+    assert d.envolver("f", lambda x: x + 1)(1) == 2
+    d.registrar_ciclo()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_perfila_una_de_cada_n_y_rota_informes(tmp_path):
+    d = Diagnostico(tmp_path, activo=True, cada_n_perfil=2, max_informes=3)
+    f = d.envolver("suma", lambda a, b: a + b)
+    for i in range(10):
+        assert f(i, 1) == i + 1
+    d.desactivar()
+
+    informes = sorted(tmp_path.glob("perfil_suma_*.txt"))
+    assert len(informes) == 3                     # 5 perfiles, se conservan 3
+    assert "suma: llamada 10" in informes[-1].read_text(encoding="utf-8")
+
+
+def test_instantaneas_de_memoria_con_diferencias(tmp_path):
+    d = Diagnostico(tmp_path, activo=True, cada_n_memoria=2)
+    retenidos = []
+    for _ in range(4):
+        retenidos.append(bytearray(100_000))
+        d.registrar_ciclo()
+    d.desactivar()
+
+    informes = sorted(tmp_path.glob("memoria_*.txt"))
+    assert len(informes) == 2
+    texto = informes[-1].read_text(encoding="utf-8")
+    assert "Cambios desde la instantánea anterior" in texto
+    assert "Cambios desde la primera instantánea" in texto
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="sin SIGUSR1")
+def test_senal_conmuta_el_modo(tmp_path):
+    anterior = signal.getsignal(signal.SIGUSR1)
+    d = Diagnostico(tmp_path, activo=False)
+    try:
+        assert d.instalar_senal()
+        os.kill(os.getpid(), signal.SIGUSR1)
+        d.registrar_ciclo()
+        assert d.activo
+        os.kill(os.getpid(), signal.SIGUSR1)
+        d.registrar_ciclo()
+        assert not d.activo
+    finally:
+        signal.signal(signal.SIGUSR1, anterior)
+        d.desactivar()
+
+
+def test_rotacion_no_mezcla_estaciones_con_prefijo_comun(tmp_path):
+    d = Diagnostico(tmp_path, activo=True, cada_n_perfil=1, max_informes=2)
+    corta = d.envolver("leer_principal", lambda: None)
+    larga = d.envolver("leer_principal_2", lambda: None)
+    for _ in range(3):
+        larga()
+    for _ in range(3):
+        corta()
+    d.desactivar()
+
+    # 2 de cada estación: la rotación de la corta no borró los de la larga
+    assert len(list(tmp_path.glob("perfil_leer_principal_2_*.txt"))) == 2
+    assert len(list(tmp_path.glob("perfil_*.txt"))) == 4
+
+
+def test_perfiles_simultaneos_no_pierden_la_llamada(tmp_path, monkeypatch):
+    d = Diagnostico(tmp_path, activo=True, cada_n_perfil=1)
+    dentro, seguir = threading.Event(), threading.Event()
+
+    def lenta():
+        dentro.set()
+        seguir.wait(5)
+        return "lenta"
+
+    hilo = threading.Thread(target=d.envolver("lenta", lenta))
+    hilo.start()
+    assert dentro.wait(5)
+    # Mientras "lenta" se perfila en otro hilo, "rapida" se ejecuta sin perfil
+    assert d.envolver("rapida", lambda: "rapida")() == "rapida"
+    seguir.set()
+    hilo.join()
+    assert [p.name.split("_")[1] for p in tmp_path.glob("perfil_*.txt")] == ["lenta"]
+
+    # Perfilador ajeno activo (en Python ≥ 3.12 enable() lanza ValueError)
+    class PerfilOcupado:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr("utils.diagnostico.cProfile.Profile", PerfilOcupado)
+    assert d.envolver("rapida", lambda: "rapida")() == "rapida"
+    assert d.envolver("rapida", lambda: "otra vez")() == "otra vez"   # el candado se liberó
@@ -0,0 +1,126 @@
+import pytest
+
+from sensors.espectral import PerfilEspectral, CANALES_ESPECTRALES, TEMPERATURAS_ESPECTRALES
+from sensors.manager import GestorSensores
+
+
+class SensorFalso:
+    """Imita la API de qwiic_as7265x y cuenta las llamadas."""
+
+    def __init__(self):
+        self.llamadas = []
+        self.lectura = 0
+
+    def __getattr__(self, nombre):
+        if nombre.startswith("get_calibrated_"):
+            def leer():
+                self.llamadas.append(nombre)
+                return 10.0 * self.lectura
+            return leer
+        raise AttributeError(nombre)
+
+    def take_measurements(self):
+        self.lectura += 1
+        self.llamadas.append("take_measurements")
+
+    def take_measurements_with_bulb(self):
+        self.lectura += 1
+        self.llamadas.append("take_measurements_with_bulb")
+
+    def enable_bulb(self, n):
+        self.llamadas.append(f"enable_bulb_{n}")
+
+    def disable_bulb(self, n):
+        self.llamadas.append(f"disable_bulb_{n}")
+
+    def get_temperature(self, n):
+        self.llamadas.append(f"get_temperature_{n}")
+        return 25
+
+
+def test_perfil_por_defecto_lee_todos_los_canales():
+    p = PerfilEspectral()
+    assert p.canales == list(CANALES_ESPECTRALES)
+    assert p.campos()[-3:] == list(TEMPERATURAS_ESPECTRALES)
+
+
+def test_perfil_por_indices_lee_solo_canales_necesarios():
+    sensor = SensorFalso()
+    p = PerfilEspectral(indices=["NDVI", "GNDVI"], leer_temperaturas=False)
+    out = p.medir(sensor)
+
+    assert set(out) == {"W_860nm", "R_610nm", "E_510nm"}
+    lecturas = [c for c in sensor.llamadas if c.startswith("get_calibrated_")]
+    assert sorted(lecturas) == ["get_calibrated_e", "get_calibrated_r", "get_calibrated_w"]
+
+
+def test_rafaga_promedia_y_enciende_bulbo_una_vez():
+    sensor = SensorFalso()
+    p = PerfilEspectral(canales=["W_860nm"], leer_temperaturas=False, rafaga=3)
+    out = p.medir(sensor)
+
+    # Lecturas 10, 20, 30 → media 20
+    assert out["W_860nm"] == pytest.approx(20.0)
+    assert sensor.llamadas.count("take_measurements") == 3
+    assert sensor.llamadas.count("enable_bulb_0") == 1
+    assert sensor.llamadas.count("disable_bulb_0") == 1
+
+
+def test_sin_bulbo_no_toca_leds():
+    sensor = SensorFalso()
+    PerfilEspectral(usar_bulbo=False, canales=["R_610nm"]).medir(sensor)
+    assert not any("bulb" in c for c in sensor.llamadas)
+
+
+def test_parametros_invalidos():
+    with pytest.raises(ValueError):
+        PerfilEspectral(ganancia=5)
+    with pytest.raises(ValueError):
+        PerfilEspectral(canales=["X_999nm"])
+    with pytest.raises(ValueError):
+        PerfilEspectral(canales=["W_860nm"], indices=["NDVI"])
+
+
+def test_gestor_omite_indices_sin_canales():
+    g = GestorSensores(perfil_espectral=PerfilEspectral(indices=["NDVI"]))
+    datos = g.leer_todo()
+
+    assert "NDVI" in datos
+    assert "E_510nm" not in datos
+    assert "GNDVI" not in datos
+
+
+def test_ciclos_integracion_y_ganancia():
+    # 2,8 ms × (ciclos + 1): 140 ms es el valor de fábrica, 49 ciclos
+    assert PerfilEspectral().ciclos_integracion == 49
+    assert PerfilEspectral(tiempo_integracion_ms=2.8).ciclos_integracion == 0
+    assert PerfilEspectral(tiempo_integracion_ms=10_000).ciclos_integracion == 255
+
+    class Registro:
+        def set_integration_cycles(self, n):
+            self.ciclos = n
+
+        def set_gain(self, codigo):
+            self.ganancia = codigo
+
+    sensor = Registro()
+    PerfilEspectral(ganancia=3.7).aplicar(sensor)
+    assert (sensor.ciclos, sensor.ganancia) == (49, 0b01)
+
+
+def test_bulbo_se_apaga_aunque_cambie_el_perfil_en_plena_rafaga():
+    perfil = PerfilEspectral(usar_bulbo=True, rafaga=3, canales=["R_610nm"])
+    sensor = SensorFalso()
+    original = sensor.take_measurements
+
+    def medir_y_recortar():
+        # El recorte por salud del host llega desde otro hilo a mitad de ráfaga
+        perfil.usar_bulbo = False
+        original()
+
+    sensor.take_measurements = medir_y_recortar
+    perfil.medir(sensor)
+    encendidos = {c for c in sensor.llamadas if c.startswith("enable_bulb")}
+    apagados = {c for c in sensor.llamadas if c.startswith("disable_bulb")}
+    assert len(encendidos) == 3
+    assert {c.replace("enable", "disable") for c in encendidos} == apagados
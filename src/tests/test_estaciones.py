@@ -0,0 +1,70 @@
+import json
+import threading
+
+import pytest
+
+from sensors.estaciones import (
+    EjecutorEstaciones, cargar_inventario, crear_estaciones, inventario_por_defecto
+)
+
+SOLO_SUELO = {"suelo": {"puerto": "/dev/null", "direccion": 1, "baudrate": 9600}}
+
+
+def test_inventario_por_defecto_una_estacion_con_ventilador():
+    inv = inventario_por_defecto()
+    assert len(inv) == 1
+    assert inv[0]["ventilador"] is True
+
+
+def test_cargar_inventario_valida_ids(tmp_path):
+    ruta = tmp_path / "estaciones.json"
+    ruta.write_text(json.dumps({"estaciones": [
+        {"station_id": "a", "dispositivos": SOLO_SUELO},
+        {"station_id": "a", "dispositivos": SOLO_SUELO},
+    ]}))
+    with pytest.raises(ValueError):
+        cargar_inventario(ruta)
+
+
+def test_dispositivos_deshabilitados_no_se_leen():
+    est, = crear_estaciones([{"station_id": "norte", "dispositivos": SOLO_SUELO}])
+    datos = est.gestor.leer_todo()
+
+    assert datos["station_id"] == "norte"
+    assert "humedad_suelo" in datos
+    assert "temperatura" not in datos
+    assert "W_860nm" not in datos
+
+
+def test_ejecutor_entrega_muestras_de_todas_las_estaciones():
+    estaciones = crear_estaciones([
+        {"station_id": "a", "intervalo": 0.01, "dispositivos": SOLO_SUELO},
+        {"station_id": "b", "intervalo": 0.02, "dispositivos": SOLO_SUELO},
+    ])
+    recibidas = []
+    listo = threading.Event()
+
+    def al_recibir(est, datos):
+        recibidas.append(datos["station_id"])
+        if {"a", "b"} <= set(recibidas) and len(recibidas) >= 4:
+            listo.set()
+
+    ejecutor = EjecutorEstaciones(estaciones, al_recibir)
+    hilo = threading.Thread(target=ejecutor.ejecutar)
+    hilo.start()
+    assert listo.wait(2)
+    ejecutor.detener()
+    hilo.join(2)
+
+    assert not hilo.is_alive()
+    assert {"a", "b"} <= set(recibidas)
+
+
+def test_estacion_lee_espectral_uno_de_cada_n():
+    est, = crear_estaciones([{"station_id": "a", "dispositivos": {"espectral": {}}}])
+    est.cada_n_espectral = 3
+    con_espectro = ["W_860nm" in est.leer() for _ in range(6)]
+    assert con_espectro == [False, False, True, False, False, True]
+
+    est.cada_n_espectral = 0
+    assert "W_860nm" not in est.leer()
@@ -5,3 +5,23 @@ Verifica que los dos paquetes principales se puedan importar.
 def test_imports():
     import sensors.manager
     import control.ventilador
+
+
+def _modulos_cargados(modulo):
+    """Módulos de sensores que arrastra importar 'modulo' en un intérprete limpio."""
+    import subprocess, sys
+    from pathlib import Path
+    codigo = (f"import sys, {modulo}; "
+              "print(' '.join(m for m in ('numpy', 'minimalmodbus', 'sensors') if m in sys.modules))")
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=Path(__file__).parents[1],
+                            capture_output=True, text=True, check=True)
+    return salida.stdout.split()
+
+
+def test_csv_export_no_carga_los_sensores():
+    assert _modulos_cargados("utils.csv_export") == []
+
+
+def test_lector_memoria_no_carga_los_sensores():
+    # Lo usan procesos ligeros (kiosko, riego) sin numpy ni Modbus
+    assert _modulos_cargados("utils.memoria_compartida") == []
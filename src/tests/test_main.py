@@ -0,0 +1,27 @@
+import main
+from utils.reloj import RelojSimulado
+
+SOLO_ARMARIO = {"xy_md04": {"puerto": "/dev/null", "direccion": 5, "baudrate": 9600}}
+
+
+def test_main_simula_un_dia_sin_tocar_el_exterior(monkeypatch):
+    # Cualquier arranque de componentes "reales" haría fallar el test
+    def prohibido(*args, **kwargs):
+        raise AssertionError("componente de producción arrancado con reloj simulado")
+
+    for nombre in ("SincronizadorDatos", "MonitorSaludHost", "DescubridorModbus",
+                   "sumideros_por_defecto", "publish_telemetry"):
+        monkeypatch.setattr(main, nombre, prohibido)
+
+    reloj = RelojSimulado()
+    muestras = []
+    main.main(reloj, duracion=24 * 3600, sumideros={"prueba": muestras.append},
+              inventario=[{"station_id": "sim", "intervalo": 60, "ventilador": True,
+                           "dispositivos": SOLO_ARMARIO}])
+
+    assert reloj.monotonic() == 24 * 3600
+    assert len(muestras) == 24 * 60
+    instantes = [m["timestamp"] for m in muestras]
+    assert instantes == sorted(instantes)
+    assert instantes[-1] - instantes[0] == 24 * 3600 - 60
+    assert all(m["station_id"] == "sim" and "temperatura_armario" in m for m in muestras)
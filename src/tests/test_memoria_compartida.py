@@ -0,0 +1,69 @@
+import multiprocessing
+
+import pytest
+
+from utils.memoria_compartida import LectorMemoria, PublicadorMemoria
+
+
+def test_ultima_muestra_y_campos_ausentes(tmp_path):
+    ruta = str(tmp_path / "muestra")
+    pub = PublicadorMemoria("norte", ruta=ruta, capacidad=4)
+    lector = LectorMemoria(ruta=ruta)
+    assert lector.ultima() is None
+
+    pub.publicar({"timestamp": 1_700_000_000, "temperatura": 21.5, "luz": 800,
+                  "presion": "--", "git_commit": "abc1234"})
+    m = lector.ultima()
+    assert m == {"station_id": "norte", "timestamp": 1_700_000_000, "temperatura": 21.5,
+                 "luz": 800, "git_commit": "abc1234"}
+    pub.cerrar()
+    lector.cerrar()
+
+
+def test_historial_circular(tmp_path):
+    ruta = str(tmp_path / "muestra")
+    pub = PublicadorMemoria(ruta=ruta, capacidad=4)
+    lector = LectorMemoria(ruta=ruta)
+    for i in range(10):
+        pub.publicar({"temperatura": i})
+
+    assert lector.escrituras == 10
+    assert [m["temperatura"] for m in lector.historial()] == [6, 7, 8, 9]
+    assert [m["temperatura"] for m in lector.historial(2)] == [8, 9]
+    pub.cerrar()
+    lector.cerrar()
+
+
+def test_rechaza_region_ajena(tmp_path):
+    ruta = tmp_path / "otra"
+    ruta.write_bytes(b"XXXX" + bytes(100))
+    with pytest.raises(ValueError):
+        LectorMemoria(ruta=str(ruta))
+
+
+def _escribir(ruta, listo, total):
+    pub = PublicadorMemoria(ruta=ruta, capacidad=8)
+    listo.set()
+    for i in range(total):
+        pub.publicar({"temperatura": i, "humedad": i, "K_900nm": i})
+    pub.cerrar()
+
+
+def test_lector_nunca_ve_muestras_a_medias(tmp_path):
+    ruta = str(tmp_path / "muestra")
+    total = 20_000
+    listo = multiprocessing.Event()
+    escritor = multiprocessing.Process(target=_escribir, args=(ruta, listo, total))
+    escritor.start()
+    assert listo.wait(10)
+
+    lector = LectorMemoria(ruta=ruta)
+    leidas = 0
+    while escritor.is_alive() or leidas == 0:
+        m = lector.ultima()
+        if m is not None:
+            assert m["temperatura"] == m["humedad"] == m["K_900nm"]
+            leidas += 1
+    escritor.join()
+    assert lector.ultima()["temperatura"] == total - 1
+    lector.cerrar()
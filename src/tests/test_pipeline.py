@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from utils.pipeline import PipelineSumideros, Sumidero
+
+
+def esperar(condicion, timeout=3.0):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if condicion():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_sumidero_lento_no_bloquea_publicacion():
+    liberar = threading.Event()
+    p = PipelineSumideros()
+    p.agregar("lento", lambda d: liberar.wait(2), capacidad=2, politica="descartar_antiguo")
+    rapidas = []
+    p.agregar("rapido", rapidas.append, capacidad=100)
+
+    t0 = time.monotonic()
+    for i in range(20):
+        p.publicar({"n": i})
+    assert time.monotonic() - t0 < 0.5
+
+    assert esperar(lambda: len(rapidas) == 20)
+    liberar.set()
+    assert esperar(lambda: p.sumidero("lento").estadisticas()["en_cola"] == 0)
+    est = p.sumidero("lento").estadisticas()
+    assert est["recibidas"] == 20
+    assert est["descartadas"] > 0
+    p.detener()
+
+
+def test_volcado_a_disco_conserva_todo_y_el_orden(tmp_path):
+    liberar = threading.Event()
+    vistas = []
+
+    def fn(d):
+        liberar.wait(2)
+        vistas.append(d["n"])
+
+    s = Sumidero("csv", fn, capacidad=2, politica="volcar_disco",
+                 ruta_volcado=str(tmp_path / "cola.jsonl"))
+    for i in range(10):
+        s.entregar({"n": i})
+    assert s.estadisticas()["volcadas"] > 0
+
+    liberar.set()
+    assert esperar(lambda: len(vistas) == 10)
+    assert vistas == list(range(10))
+    assert not (tmp_path / "cola.jsonl").exists()
+    s.detener()
+
+
+def test_pausa_descarta_y_reanuda():
+    vistas = []
+    s = Sumidero("dashboard", vistas.append)
+    s.pausar()
+    s.entregar({"n": 1})
+    s.reanudar()
+    s.entregar({"n": 2})
+    assert esperar(lambda: vistas == [{"n": 2}])
+    assert s.estadisticas()["descartadas"] == 1
+    s.detener()
+
+
+def test_politica_invalida():
+    with pytest.raises(ValueError):
+        Sumidero("x", print, politica="tirar_todo")
+    with pytest.raises(ValueError):
+        Sumidero("x", print, politica="volcar_disco")
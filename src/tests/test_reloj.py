@@ -0,0 +1,61 @@
+import math
+
+from control.planificador import obtener_planificador
+from control.ventilador import VentiladorCtrl
+from sensors.estaciones import EjecutorEstaciones, crear_estaciones
+from utils.reloj import RelojSimulado
+
+SOLO_SUELO = {"suelo": {"puerto": "/dev/null", "direccion": 1, "baudrate": 9600}}
+
+
+def test_avanzar_ejecuta_tareas_en_orden_y_a_su_hora():
+    reloj = RelojSimulado()
+    p = obtener_planificador(reloj)
+    assert obtener_planificador(reloj) is p
+    vistos = []
+    p.programar(5, lambda: vistos.append(("b", reloj.monotonic())))
+    p.programar(2, lambda: vistos.append(("a", reloj.monotonic())))
+    p.cancelar(p.programar(3, vistos.append, "cancelada"))
+
+    reloj.avanzar(4)
+    assert vistos == [("a", 2)]
+    reloj.avanzar(10)
+    assert vistos == [("a", 2), ("b", 5)]
+    assert reloj.monotonic() == 14
+
+
+def test_semana_de_control_del_ventilador():
+    reloj = RelojSimulado()
+    v = VentiladorCtrl(temp_on=30, temp_off=25, tiempo_min_estado=600, reloj=reloj)
+    cambios = 0
+    anterior = v.estado_vent
+    # Temperatura del armario con ciclo diario entre 17 y 33 °C, cada 10 s
+    for paso in range(7 * 24 * 360):
+        temp = 25 + 8 * math.sin(2 * math.pi * paso / (24 * 360))
+        v.controlar_por_temperatura(temp)
+        if v.estado_vent != anterior:
+            cambios += 1
+            anterior = v.estado_vent
+        reloj.dormir(10)
+
+    assert cambios == 14   # un encendido y un apagado por día
+    assert v.estado_act is False   # el último pulso de cierre ya terminó
+
+
+def test_ejecutor_simula_una_hora_al_instante():
+    reloj = RelojSimulado()
+    estaciones = crear_estaciones([
+        {"station_id": "norte", "intervalo": 10, "dispositivos": SOLO_SUELO},
+        {"station_id": "sur",   "intervalo": 60, "dispositivos": SOLO_SUELO},
+    ], reloj=reloj)
+    recibidas = []
+    ejecutor = EjecutorEstaciones(
+        estaciones, lambda est, datos: recibidas.append((est.station_id, reloj.monotonic())),
+        reloj=reloj,
+    )
+    ejecutor.ejecutar(hasta=3600)
+
+    assert reloj.monotonic() == 3600
+    assert sum(1 for sid, _ in recibidas if sid == "norte") == 360
+    assert sum(1 for sid, _ in recibidas if sid == "sur") == 60
+    assert [t for _, t in recibidas] == sorted(t for _, t in recibidas)
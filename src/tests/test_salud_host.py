@@ -0,0 +1,58 @@
+import pytest
+
+from utils.salud_host import MonitorSaludHost
+
+
+@pytest.fixture
+def host(tmp_path):
+    temp = tmp_path / "temp"
+    carga = tmp_path / "loadavg"
+    mem = tmp_path / "meminfo"
+    temp.write_text("50000\n")
+    carga.write_text("0.10 0.20 0.30 1/100 1234\n")
+    mem.write_text("MemTotal:  4000000 kB\nMemAvailable:  2048000 kB\n")
+    monitor = MonitorSaludHost(
+        temp_degradado=70, temp_critico=78, histeresis=5,
+        ruta_temperatura=str(temp), ruta_carga=str(carga), ruta_memoria=str(mem),
+    )
+    yield monitor, temp, mem
+    monitor.cerrar()
+
+
+def test_lecturas_con_descriptor_persistente(host):
+    monitor, temp, _ = host
+    lectura = monitor.leer()
+    assert lectura["temperatura_cpu"] == 50.0
+    assert lectura["carga_1m"] == 0.10
+    assert lectura["memoria_disponible_mb"] == 2000.0
+
+    temp.write_text("61500\n")   # mismo fichero, contenido nuevo
+    assert monitor.leer()["temperatura_cpu"] == 61.5
+
+
+def test_niveles_con_histeresis(host):
+    monitor, temp, _ = host
+    cambios = []
+    monitor.al_cambiar(lambda nivel, lectura: cambios.append(nivel))
+
+    for mili in (72000, 79000, 76000, 72000, 67000, 64000):
+        temp.write_text(f"{mili}\n")
+        monitor.evaluar()
+
+    # 76 °C sigue crítico (78-5); 67 °C sigue degradado (70-5)
+    assert cambios == ["degradado", "critico", "degradado", "normal"]
+
+
+def test_memoria_baja_es_critica(host):
+    monitor, _, mem = host
+    mem.write_text("MemAvailable:  20480 kB\n")
+    monitor.evaluar()
+    assert monitor.nivel == "critico"
+
+
+def test_fichero_inexistente_no_rompe(tmp_path):
+    monitor = MonitorSaludHost(ruta_temperatura=str(tmp_path / "no"),
+                               ruta_carga=str(tmp_path / "no"),
+                               ruta_memoria=str(tmp_path / "no"))
+    assert monitor.evaluar()["temperatura_cpu"] is None
+    assert monitor.nivel == "normal"
@@ -0,0 +1,57 @@
+import pytest
+import requests
+
+from utils.generador_carga import generar_carga, percentil
+from utils.servidor_ingesta import ServidorIngesta
+from utils.sincronizacion import SincronizadorDatos
+from utils.tb_client import publish_telemetry, publish_telemetry_lote
+
+
+@pytest.fixture
+def servidor():
+    srv = ServidorIngesta(semilla=1).iniciar()
+    yield srv
+    srv.detener()
+
+
+def test_ingesta_simple_y_lote(servidor):
+    assert publish_telemetry({"temperatura": 20.5}, url=f"{servidor.url}/datos") is True
+    assert publish_telemetry_lote([{"a": 1}, {"a": 2}], url=f"{servidor.url}/datos") is True
+
+    est = requests.get(f"{servidor.url}/estadisticas").json()
+    assert est["muestras"] == 3
+    assert est["lotes"] == 1
+
+
+def test_caida_y_recuperacion(servidor):
+    requests.post(f"{servidor.url}/control", json={"caido": True})
+    assert publish_telemetry({"x": 1}, url=f"{servidor.url}/datos") is False
+    requests.post(f"{servidor.url}/control", json={"caido": False})
+    assert publish_telemetry({"x": 1}, url=f"{servidor.url}/datos") is True
+
+
+def test_generador_mide_errores_y_latencia(servidor):
+    requests.post(f"{servidor.url}/control", json={"tasa_error": 0.5, "latencia": 0.01})
+    res = generar_carga(lambda m: publish_telemetry(m, url=f"{servidor.url}/datos"),
+                        tasa=100, duracion=0.4, concurrencia=4)
+
+    assert res["enviados"] == 40
+    assert res["correctos"] + res["errores"] == 40
+    assert 0 < res["errores"] < 40
+    assert res["latencia_ms"]["p50"] >= 10
+
+
+def test_sincronizacion_contra_servidor_local(servidor, tmp_path):
+    csv = tmp_path / "datos.csv"
+    csv.write_text("a,b\n1,2\n3,4\n")
+    s = SincronizadorDatos(str(tmp_path / "*.csv"), url=f"{servidor.url}/sync",
+                           ruta_estado=str(tmp_path / "estado.json"))
+    assert s.sincronizar() == 3
+    assert servidor.estado.sync["datos.csv"] == csv.read_bytes()
+
+
+def test_percentil():
+    valores = list(range(1, 101))
+    assert percentil(valores, 50) == 50
+    assert percentil(valores, 99) == 99
+    assert percentil([], 50) == 0.0
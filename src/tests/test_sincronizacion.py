@@ -0,0 +1,110 @@
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from utils.sincronizacion import SincronizadorDatos
+
+
+class ServidorSync(HTTPServer):
+    """Servidor de pruebas que implementa el protocolo de sincronización."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ManejadorSync)
+        self.recibido = {}        # archivo → bytes
+        self.perder_ack = 0       # nº de ACK a "perder" (se guarda pero responde 500)
+        self.peticiones = 0
+
+
+class ManejadorSync(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        srv = self.server
+        srv.peticiones += 1
+        cuerpo = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        contenido = cuerpo["contenido"].encode()
+        actual = srv.recibido.get(cuerpo["archivo"], b"")
+
+        if hashlib.sha256(contenido).hexdigest() != cuerpo["sha256"]:
+            return self._responder(400, {"error": "sha256"})
+        if cuerpo["offset"] != len(actual):
+            return self._responder(409, {"offset": len(actual)})
+
+        srv.recibido[cuerpo["archivo"]] = actual + contenido
+        if srv.perder_ack:
+            srv.perder_ack -= 1
+            return self._responder(500, {"error": "simulado"})
+        self._responder(200, {"offset": cuerpo["fin"]})
+
+    def _responder(self, codigo, cuerpo):
+        datos = json.dumps(cuerpo).encode()
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+
+@pytest.fixture
+def servidor():
+    srv = ServidorSync()
+    hilo = threading.Thread(target=srv.serve_forever, daemon=True)
+    hilo.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def nuevo_sync(tmp_path, servidor, **kw):
+    url = f"http://127.0.0.1:{servidor.server_port}/sync"
+    return SincronizadorDatos(str(tmp_path / "datos*.csv"), url=url,
+                              ruta_estado=str(tmp_path / "estado.json"), **kw)
+
+
+def test_sube_solo_filas_nuevas_en_bloques(tmp_path, servidor):
+    csv = tmp_path / "datos.csv"
+    csv.write_text("a,b\n" + "".join(f"{i},{i}\n" for i in range(10)))
+
+    s = nuevo_sync(tmp_path, servidor, filas_por_bloque=4)
+    assert s.sincronizar() == 11
+    assert servidor.peticiones == 3
+
+    with open(csv, "a") as f:
+        f.write("10,10\n11,1")      # la última fila está a medio escribir
+    assert s.sincronizar() == 1
+    assert servidor.recibido["datos.csv"] == csv.read_bytes()[:-4]
+
+
+def test_reanuda_tras_reinicio_y_ack_perdido(tmp_path, servidor):
+    csv = tmp_path / "datos.csv"
+    csv.write_text("a\n1\n2\n")
+    s = nuevo_sync(tmp_path, servidor)
+
+    # El servidor guarda el bloque pero el ACK se pierde
+    servidor.perder_ack = 1
+    assert s.sincronizar() == 0
+
+    with open(csv, "a") as f:
+        f.write("3\n")
+    # Un proceso nuevo parte del estado en disco y se realinea con el servidor
+    s2 = nuevo_sync(tmp_path, servidor)
+    s2.sincronizar()
+    assert servidor.recibido["datos.csv"] == csv.read_bytes()
+
+
+def test_fichero_rotado_se_sube_desde_el_inicio(tmp_path, servidor):
+    csv = tmp_path / "datos.csv"
+    csv.write_text("a\n1\n2\n3\n")
+    s = nuevo_sync(tmp_path, servidor)
+    s.sincronizar()
+
+    csv.write_text("a\n9\n")
+    estado = s._cargar_estado()
+    assert estado[str(csv)]["offset"] == len("a\n1\n2\n3\n")
+    servidor.recibido.clear()
+    s.sincronizar()
+    assert servidor.recibido["datos.csv"] == b"a\n9\n"
@@ -1,5 +1,9 @@
 import pytest
+import threading
+
 from control.ventilador import VentiladorCtrl, PULSO_CIERRE
+from control.planificador import PlanificadorActuadores
+from utils.reloj import RelojSimulado
 
 @pytest.fixture
 def v():
@@ -30,17 +34,15 @@ def test_reset_actuador(v):
     v._reset_act()
     assert v.estado_act is False, "Después de reset, el actuador debe quedar desactivado"
 
-def test_pulso_cierre_programa_timer(v, monkeypatch):
-    # Aquí comprobamos que _apagar lanza un timer de la duración correcta
-    timers = []
-    monkeypatch.setattr("threading.Timer", lambda t, fn: timers.append((t, fn)) or type("T", (), {"start": lambda self: None})())
-    # Llamamos al apagado
+def test_pulso_cierre_libera_actuador_a_su_hora():
+    # Con reloj simulado el pulso se comprueba sin esperar PULSO_CIERRE segundos reales
+    reloj = RelojSimulado()
+    v = VentiladorCtrl(reloj=reloj)
     v._apagar()
-    # Debe haberse creado exactamente un timer
-    assert len(timers) == 1
-    duracion, funcion = timers[0]
-    assert duracion == PULSO_CIERRE, f"El pulso debe durar {PULSO_CIERRE}s"
-    assert funcion == v._reset_act, "El timer debe llamar a _reset_act"
+    reloj.avanzar(PULSO_CIERRE - 0.1)
+    assert v.estado_act is True, "El actuador sigue activo antes de PULSO_CIERRE"
+    reloj.avanzar(0.2)
+    assert v.estado_act is False, f"El pulso debe durar {PULSO_CIERRE}s"
 
 def test_control_manual_apertura_cierre(v):
     # Alternando manualmente los pines
@@ -52,3 +54,37 @@ def test_control_manual_apertura_cierre(v):
     v._encender()
     assert v.estado_vent       is True
     assert v.estado_act        is False
+
+def test_permanencia_minima_evita_oscilacion():
+    v = VentiladorCtrl(tiempo_min_estado=3600)
+    v.controlar_por_temperatura(40.0)
+    assert v.estado_vent is True
+    # Oscilación inmediata alrededor de los umbrales: se ignora
+    v.controlar_por_temperatura(20.0)
+    assert v.estado()["ventilador"] is True
+    v.cleanup()
+
+def test_pulso_antiguo_no_libera_actuador(v):
+    v._apagar()
+    pulso_viejo = v._pulso_id
+    v._encender()
+    v._apagar()
+    # El pulso del primer apagado llega tarde: no debe cortar el segundo
+    v._reset_act(pulso_viejo)
+    assert v.estado_act is True
+    v._reset_act(v._pulso_id)
+    assert v.estado_act is False
+
+def test_planificador_ejecuta_en_orden_y_cancela():
+    p = PlanificadorActuadores()
+    hecho = threading.Event()
+    orden = []
+    t_cancelada = p.programar(0.01, orden.append, "cancelada")
+    p.programar(0.05, orden.append, "segunda")
+    p.programar(0.02, orden.append, "primera")
+    p.programar(0.06, hecho.set)
+    assert p.cancelar(t_cancelada) is True
+    assert hecho.wait(2)
+    assert orden == ["primera", "segunda"]
+    assert p.pendientes() == 0
+    p.detener()
@@ -0,0 +1,239 @@
+# utils/codificacion.py
+"""
+Telemetría binaria compacta
+---------------------------
+Alternativa a enviar el JSON completo: los campos van en el orden de
+CAMPOS_EXPORT, sin nombres, como enteros escalados en varint.
+
+Trama:
+
+  MAGIA | ID_ESQUEMA | VERSION | flags | len+station_id | seq (varint)
+        | mapa de presencia (1 bit por campo) | valores
+
+  • Numéricos: round(valor * escala) en varint zigzag. En tramas delta
+    (flags & DELTA) se envía la diferencia con la muestra anterior del
+    mismo station_id si esta tenía el campo.
+  • Texto (git_commit): longitud + UTF-8; en tramas delta, longitud 0
+    significa "igual que la anterior".
+  • Cada 'intervalo_clave' tramas (o tras forzar_clave()) va una trama
+    completa; el decodificador rechaza una delta cuya seq no sigue a la
+    última recibida.
+
+Los campos que no están en CAMPOS_EXPORT (p. ej. los índices) no viajan:
+el receptor los recalcula con utils.indices. Solo depende de utils.esquema,
+así el backend puede usar DecodificadorTelemetria tal cual.
+"""
+
+import math
+import time
+
+from utils.esquema import CAMPOS_EXPORT
+
+MAGIA      = 0xB7
+ID_ESQUEMA = 0x01   # CAMPOS_EXPORT
+VERSION    = 1
+
+FLAG_DELTA = 0x01
+
+INTERVALO_CLAVE = 60    # tramas entre tramas completas
+MAX_SEQ         = 1 << 16
+
+# Escala de cada campo (resolución = 1/escala). None = texto.
+ESCALAS_V1 = {
+    "timestamp":             1,
+    "direccion_viento":      1,
+    "velocidad_viento_prom": 100,
+    "velocidad_viento_max":  100,
+    "temperatura":           10,
+    "humedad":               10,
+    "presion":               10,
+    "luz":                   1,
+    "indice_uv":             10,
+    "lluvia":                10,
+    "humedad_suelo":         10,
+    "temperatura_suelo":     10,
+    "conductividad_suelo":   1,
+    "ph_suelo":              10,
+    "temperatura_armario":   10,
+    "humedad_armario":       10,
+    **{c: 100 for c in CAMPOS_EXPORT[16:34]},   # canales espectrales
+    "temp_0":                1,
+    "temp_1":                1,
+    "temp_2":                1,
+    "temperatura_cpu":       100,
+    "git_commit":            None,
+}
+
+ESQUEMA_V1 = tuple((campo, ESCALAS_V1[campo]) for campo in CAMPOS_EXPORT)
+TAM_MAPA   = (len(ESQUEMA_V1) + 7) // 8
+
+
+class ErrorTrama(ValueError):
+    """Trama corrupta, de otro esquema o delta sin referencia."""
+
+
+# ---------- VARINT ----------
+def _varint(n: int, out: bytearray) -> None:
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _zigzag(n: int) -> int:
+    return (n << 1) if n >= 0 else ((-n << 1) - 1)
+
+
+def _leer_varint(buf: bytes, pos: int) -> tuple[int, int]:
+    n = desplaz = 0
+    while True:
+        if pos >= len(buf):
+            raise ErrorTrama("varint truncado")
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << desplaz
+        if not b & 0x80:
+            return n, pos
+        desplaz += 7
+
+
+def _leer_texto(buf: bytes, pos: int) -> tuple[str, int]:
+    """Longitud (varint) + UTF-8, comprobando que cabe en la trama."""
+    n, pos = _leer_varint(buf, pos)
+    if pos + n > len(buf):
+        raise ErrorTrama(f"texto de {n} bytes más largo que la trama")
+    try:
+        return buf[pos:pos + n].decode("utf-8"), pos + n
+    except UnicodeDecodeError as e:
+        raise ErrorTrama(f"texto no UTF-8: {e.reason}") from None
+
+
+def _deszigzag(n: int) -> int:
+    return (n >> 1) if not n & 1 else -((n + 1) >> 1)
+
+
+def _cuantizar(valor, escala):
+    """Entero escalado, o None si el valor no es numérico/finito."""
+    if isinstance(valor, bool):
+        return int(valor)
+    try:
+        v = float(valor)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(v):
+        return None
+    return round(v * escala)
+
+
+# ---------- CODIFICADOR ----------
+class CodificadorTelemetria:
+    """Codifica las muestras de UNA estación (guarda la anterior para las deltas)."""
+
+    def __init__(self, station_id: str = "", delta: bool = True, intervalo_clave=INTERVALO_CLAVE):
+        self.station_id      = station_id.encode("utf-8")
+        self.delta           = delta
+        self.intervalo_clave = intervalo_clave
+        self._seq            = 0
+        self._anterior       = None   # {campo: entero o texto}
+
+    def forzar_clave(self) -> None:
+        """La próxima trama será completa (p. ej. si se perdió un envío)."""
+        self._anterior = None
+
+    def codificar(self, datos: dict) -> bytes:
+        valores = {}
+        for campo, escala in ESQUEMA_V1:
+            v = datos.get(campo)
+            if campo == "timestamp" and not isinstance(v, (int, float)):
+                v = time.time()
+            if escala is None:
+                if isinstance(v, str) and v:
+                    valores[campo] = v
+            else:
+                q = _cuantizar(v, escala)
+                if q is not None:
+                    valores[campo] = q
+
+        seq = self._seq
+        self._seq = (self._seq + 1) % MAX_SEQ
+        es_delta = (self.delta and self._anterior is not None
+                    and seq % self.intervalo_clave != 0)
+        anterior = self._anterior if es_delta else {}
+
+        out = bytearray((MAGIA, ID_ESQUEMA, VERSION, FLAG_DELTA if es_delta else 0))
+        _varint(len(self.station_id), out)
+        out += self.station_id
+        _varint(seq, out)
+
+        mapa = bytearray(TAM_MAPA)
+        cuerpo = bytearray()
+        for i, (campo, escala) in enumerate(ESQUEMA_V1):
+            if campo not in valores:
+                continue
+            mapa[i >> 3] |= 1 << (i & 7)
+            v = valores[campo]
+            if escala is None:
+                crudo = b"" if anterior.get(campo) == v else v.encode("utf-8")
+                _varint(len(crudo), cuerpo)
+                cuerpo += crudo
+            elif campo in anterior:
+                _varint(_zigzag(v - anterior[campo]), cuerpo)
+            else:
+                _varint(_zigzag(v), cuerpo)
+
+        self._anterior = valores
+        return bytes(out + mapa + cuerpo)
+
+
+# ---------- DECODIFICADOR ----------
+class DecodificadorTelemetria:
+    """Decodifica tramas de cualquier número de estaciones (estado por station_id)."""
+
+    def __init__(self):
+        self._estado = {}   # station_id → (seq, {campo: entero o texto})
+
+    def decodificar(self, trama: bytes) -> dict:
+        if len(trama) < 4 or trama[0] != MAGIA:
+            raise ErrorTrama("no es una trama de telemetría")
+        if trama[1] != ID_ESQUEMA or trama[2] != VERSION:
+            raise ErrorTrama(f"esquema {trama[1]} v{trama[2]} no soportado")
+        es_delta = bool(trama[3] & FLAG_DELTA)
+
+        station_id, pos = _leer_texto(trama, 4)
+        seq, pos = _leer_varint(trama, pos)
+
+        anterior = {}
+        if es_delta:
+            ref = self._estado.get(station_id)
+            if ref is None or (ref[0] + 1) % MAX_SEQ != seq:
+                raise ErrorTrama(f"delta {seq} de '{station_id}' sin trama anterior; "
+                                 "se espera una trama completa")
+            anterior = ref[1]
+
+        mapa = trama[pos:pos + TAM_MAPA]
+        if len(mapa) != TAM_MAPA:
+            raise ErrorTrama("mapa de presencia truncado")
+        pos += TAM_MAPA
+
+        valores = {}
+        for i, (campo, escala) in enumerate(ESQUEMA_V1):
+            if not mapa[i >> 3] & (1 << (i & 7)):
+                continue
+            if escala is None:
+                texto, pos = _leer_texto(trama, pos)
+                valores[campo] = texto if (texto or not es_delta) else anterior.get(campo, "")
+            else:
+                z, pos = _leer_varint(trama, pos)
+                valores[campo] = _deszigzag(z) + anterior.get(campo, 0)
+        if pos != len(trama):
+            raise ErrorTrama("bytes sobrantes al final de la trama")
+
+        self._estado[station_id] = (seq, valores)
+
+        muestra = {"station_id": station_id} if station_id else {}
+        for campo, escala in ESQUEMA_V1:
+            if campo not in valores:
+                continue
+            v = valores[campo]
+            muestra[campo] = v if escala in (None, 1) else v / escala
+        return muestra
@@ -2,15 +2,29 @@
 import csv, os, logging
 from datetime import datetime
 
+from utils.esquema import STATION_ID_POR_DEFECTO
+
 log = logging.getLogger(__name__)
 
 CSV_FILE = "datos_muestreo.csv"
 
-def export_row(datos: dict, campos: list[str]) -> None:
+def ruta_csv(station_id: str | None = None) -> str:
+    """CSV de la estación; la principal (o sin id) conserva CSV_FILE."""
+    if not station_id or station_id == STATION_ID_POR_DEFECTO:
+        return CSV_FILE
+    base, ext = os.path.splitext(CSV_FILE)
+    return f"{base}_{station_id}{ext}"
+
+def export_row(datos: dict, campos: list[str], ruta: str | None = None) -> None:
     if not datos:
         return
 
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    ruta = ruta or CSV_FILE
+
+    # Hora de la muestra si la trae (reloj inyectado); si no, la actual
+    ts = datos.get("timestamp")
+    instante = datetime.fromtimestamp(ts) if isinstance(ts, (int, float)) else datetime.now()
+    timestamp = instante.strftime("%Y-%m-%d %H:%M:%S")
     fila = [timestamp]
 
     for campo in campos[1:]:
@@ -19,14 +33,14 @@ def export_row(datos: dict, campos: list[str]) -> None:
             val = round(val, 4)
         fila.append(val)
 
-    nuevo_archivo = not os.path.isfile(CSV_FILE)
+    nuevo_archivo = not os.path.isfile(ruta)
 
     try:
-        with open(CSV_FILE, "a", newline="") as f:
+        with open(ruta, "a", newline="") as f:
             w = csv.writer(f)
             if nuevo_archivo:
                 w.writerow(campos)
             w.writerow(fila)
-        log.info("Fila añadida a %s", CSV_FILE)
+        log.info("Fila añadida a %s", ruta)
     except Exception:
         log.error("Error guardando CSV", exc_info=True)
@@ -0,0 +1,212 @@
+# utils/diagnostico.py
+"""
+Diagnóstico en campo (CPU y memoria)
+------------------------------------
+Modo opcional para ver, sin reiniciar ni usar un depurador, dónde se va la
+CPU y si la memoria crece en un proceso que lleva meses en marcha:
+
+  • envolver(nombre, fn) → fn que, con el modo activo, se perfila con
+    cProfile 1 de cada 'cada_n_perfil' llamadas (contador por nombre).
+    cProfile solo ve el hilo que lo activa, así que se envuelve cada
+    unidad de trabajo en su propio hilo (lectura, sumideros...). Solo hay
+    un perfil activo a la vez (desde Python 3.12 no caben dos): si toca
+    perfilar mientras otro hilo lo hace, la llamada se ejecuta sin perfil.
+  • registrar_ciclo() → una vez por ciclo del bucle principal; cada
+    'cada_n_memoria' ciclos guarda una instantánea de tracemalloc y la
+    compara con la anterior y con la primera (crecimiento acumulado).
+
+Los informes son texto en 'directorio' y se rotan: de cada tipo se
+conservan los 'max_informes' más recientes.
+
+Se activa con TFM_DIAGNOSTICO=1 o enviando SIGUSR1 al proceso (conmuta):
+
+  kill -USR1 $(pgrep -f main.py)
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import signal
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+DIRECTORIO     = Path(os.environ.get("TFM_DIAGNOSTICO_DIR", Path.home() / "tfm_diagnostico"))
+ACTIVO         = os.environ.get("TFM_DIAGNOSTICO") == "1"
+CADA_N_PERFIL  = 100    # llamadas entre perfiles de una misma función
+CADA_N_MEMORIA = 360    # ciclos entre instantáneas de memoria (~1 h a 10 s)
+MAX_INFORMES   = 10     # informes conservados por tipo
+LINEAS_INFORME = 25     # funciones / líneas por informe
+MARCOS_TRAZA   = 1      # profundidad de tracemalloc (1 = más barato)
+SENAL          = getattr(signal, "SIGUSR1", None)   # no existe en Windows
+
+# Sello de los informes: AAAAMMDD-HHMMSS_<monotonic_ns con 20 cifras>
+PATRON_SELLO   = "[0-9]" * 8 + "-" + "[0-9]" * 6 + "_" + "[0-9]" * 20
+
+
+class Diagnostico:
+    def __init__(
+        self,
+        directorio=DIRECTORIO,
+        activo=ACTIVO,
+        cada_n_perfil=CADA_N_PERFIL,
+        cada_n_memoria=CADA_N_MEMORIA,
+        max_informes=MAX_INFORMES
+    ):
+        self.directorio     = Path(directorio)
+        self.cada_n_perfil  = cada_n_perfil
+        self.cada_n_memoria = cada_n_memoria
+        self.max_informes   = max_informes
+
+        self._activo      = False
+        self._conmutar    = False      # lo pone la señal; se aplica en registrar_ciclo()
+        self._llamadas    = {}         # nombre → nº de llamadas
+        self._ciclos      = 0
+        self._primera     = None       # instantánea de referencia
+        self._anterior    = None
+        self._traza_propia = False     # tracemalloc lo arrancamos nosotros
+        self._lock        = threading.Lock()
+        self._perfilando  = threading.Lock()   # un solo cProfile activo a la vez
+
+        if activo:
+            self.activar()
+
+    # ---------- ACTIVACIÓN ----------
+    @property
+    def activo(self) -> bool:
+        return self._activo
+
+    def activar(self) -> None:
+        with self._lock:
+            if self._activo:
+                return
+            self.directorio.mkdir(parents=True, exist_ok=True)
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(MARCOS_TRAZA)
+                self._traza_propia = True
+            self._primera = self._anterior = None
+            self._activo = True
+        log.info("Diagnóstico activado (informes en %s)", self.directorio)
+
+    def desactivar(self) -> None:
+        with self._lock:
+            if not self._activo:
+                return
+            self._activo = False
+            self._primera = self._anterior = None
+            if self._traza_propia:
+                tracemalloc.stop()
+                self._traza_propia = False
+        log.info("Diagnóstico desactivado")
+
+    def instalar_senal(self, signum=SENAL) -> bool:
+        """Conmuta el modo con la señal. Solo desde el hilo principal."""
+        if signum is None:
+            return False
+
+        def _al_recibir(_signum, _frame):
+            # En el manejador solo se marca; el cambio lo hace registrar_ciclo()
+            self._conmutar = True
+
+        signal.signal(signum, _al_recibir)
+        return True
+
+    # ---------- CPU ----------
+    def envolver(self, nombre: str, fn):
+        """Devuelve fn perfilada 1 de cada cada_n_perfil llamadas (con el modo activo)."""
+
+        def envuelta(*args, **kwargs):
+            if not self._activo:
+                return fn(*args, **kwargs)
+            with self._lock:
+                n = self._llamadas.get(nombre, 0) + 1
+                self._llamadas[nombre] = n
+            if n % self.cada_n_perfil or not self._perfilando.acquire(blocking=False):
+                return fn(*args, **kwargs)
+
+            try:
+                perfil = cProfile.Profile()
+                inicio = time.perf_counter()
+                try:
+                    perfil.enable()
+                except ValueError:
+                    # Otro perfilador ajeno activo: la muestra no se pierde por esto
+                    log.debug("No se pudo perfilar %s (llamada %d)", nombre, n, exc_info=True)
+                    return fn(*args, **kwargs)
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    perfil.disable()
+                    self._informe_perfil(nombre, n, perfil, time.perf_counter() - inicio)
+            finally:
+                self._perfilando.release()
+
+        return envuelta
+
+    def _informe_perfil(self, nombre, n, perfil, duracion) -> None:
+        salida = io.StringIO()
+        salida.write(f"{nombre}: llamada {n}, {1000 * duracion:.1f} ms\n\n")
+        pstats.Stats(perfil, stream=salida).sort_stats("cumulative").print_stats(LINEAS_INFORME)
+        self._escribir(f"perfil_{nombre}", salida.getvalue())
+        log.info("Perfil de %s (llamada %d): %.1f ms", nombre, n, 1000 * duracion)
+
+    # ---------- MEMORIA ----------
+    def registrar_ciclo(self) -> None:
+        """Llamar una vez por ciclo del bucle principal."""
+        if self._conmutar:
+            self._conmutar = False
+            if self._activo:
+                self.desactivar()
+            else:
+                self.activar()
+        if not self._activo:
+            return
+        self._ciclos += 1
+        if self._ciclos % self.cada_n_memoria == 0:
+            self.instantanea_memoria()
+
+    def instantanea_memoria(self) -> None:
+        if not tracemalloc.is_tracing():
+            return
+        instantanea = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        actual, pico = tracemalloc.get_traced_memory()
+
+        lineas = [f"Memoria trazada: {actual / 1024:.1f} KiB (pico {pico / 1024:.1f} KiB), "
+                  f"ciclo {self._ciclos}", "", "Mayores asignaciones:"]
+        lineas += [f"  {s}" for s in instantanea.statistics("lineno")[:LINEAS_INFORME]]
+        for titulo, ref in (("Cambios desde la instantánea anterior:", self._anterior),
+                            ("Cambios desde la primera instantánea:", self._primera)):
+            if ref is not None:
+                lineas += ["", titulo]
+                lineas += [f"  {s}" for s in instantanea.compare_to(ref, "lineno")[:LINEAS_INFORME]]
+
+        if self._primera is None:
+            self._primera = instantanea
+        self._anterior = instantanea
+        self._escribir("memoria", "\n".join(lineas) + "\n")
+        log.info("Instantánea de memoria: %.1f KiB trazados (pico %.1f KiB)",
+                 actual / 1024, pico / 1024)
+
+    # ---------- INFORMES ----------
+    def _escribir(self, prefijo: str, texto: str) -> None:
+        try:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+            sello = time.strftime("%Y%m%d-%H%M%S")
+            ruta = self.directorio / f"{prefijo}_{sello}_{time.monotonic_ns():020d}.txt"
+            ruta.write_text(texto, encoding="utf-8")
+
+            # Anclado al formato completo del sello: "perfil_leer_principal" no
+            # debe rotar los informes de "perfil_leer_principal_2"
+            antiguos = sorted(self.directorio.glob(f"{prefijo}_{PATRON_SELLO}.txt"))
+            for viejo in antiguos[:-self.max_informes]:
+                viejo.unlink(missing_ok=True)
+        except OSError:
+            log.error("No se pudo guardar el informe de diagnóstico %s", prefijo, exc_info=True)
@@ -0,0 +1,26 @@
+# utils/esquema.py
+"""
+Esquema de exportación: orden de las columnas del CSV y de los campos de
+la telemetría binaria (utils.codificacion). Sin dependencias, para que el
+backend pueda copiarlo tal cual.
+"""
+
+# Estación que etiqueta las muestras si el inventario no dice otra cosa
+STATION_ID_POR_DEFECTO = "principal"
+
+CAMPOS_EXPORT = [
+    "timestamp",
+    # Meteorología
+    "direccion_viento", "velocidad_viento_prom", "velocidad_viento_max",
+    "temperatura", "humedad", "presion", "luz", "indice_uv", "lluvia",
+    # Suelo
+    "humedad_suelo", "temperatura_suelo", "conductividad_suelo", "ph_suelo",
+    # Armario
+    "temperatura_armario", "humedad_armario",
+    # Canales espectrales
+    "A_410nm","B_435nm","C_460nm","D_485nm","E_510nm","F_535nm","G_560nm",
+    "H_585nm","R_610nm","I_645nm","S_680nm","J_705nm","T_730nm","U_760nm",
+    "V_810nm","W_860nm","K_900nm","L_940nm","temp_0","temp_1","temp_2",
+    # CPU y Git
+    "temperatura_cpu", "git_commit"
+]
@@ -0,0 +1,147 @@
+# utils/generador_carga.py
+"""
+Generador de carga de telemetría
+--------------------------------
+Llama a un publicador (publish_telemetry, publish_telemetry_lote o
+cualquier función compatible) a una tasa fija durante un tiempo dado y
+resume caudal y latencias (p50/p90/p99/máx).
+
+La carga es de lazo abierto: los envíos se lanzan a su hora aunque los
+anteriores no hayan terminado (hasta 'concurrencia' en vuelo), así la
+latencia medida incluye la espera si el servidor no da abasto.
+
+Uso:  python -m utils.generador_carga --url http://127.0.0.1:5000/datos --tasa 50 --duracion 10
+"""
+
+import argparse
+import json
+import logging
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+TASA         = 10.0   # envíos por segundo
+DURACION     = 10.0   # segundos
+CONCURRENCIA = 4
+
+
+def muestra_sintetica(station_id="carga") -> dict:
+    """Muestra con los mismos campos (y órdenes de magnitud) que una real."""
+    r = random.uniform
+    muestra = {
+        "station_id": station_id,
+        "direccion_viento": r(0, 360), "velocidad_viento_prom": r(0, 15),
+        "velocidad_viento_max": r(5, 25), "temperatura": r(15, 35), "humedad": r(30, 90),
+        "presion": r(950, 1050), "luz": random.randint(0, 100000), "indice_uv": r(0, 12),
+        "lluvia": r(0, 5), "humedad_suelo": r(20, 80), "temperatura_suelo": r(10, 30),
+        "conductividad_suelo": random.randint(100, 2000), "ph_suelo": r(5.5, 8.5),
+        "temperatura_armario": r(15, 40), "humedad_armario": r(20, 80),
+        "temp_0": r(20, 30), "temp_1": r(20, 30), "temp_2": r(20, 30),
+        "temperatura_cpu": r(40, 70), "git_commit": "0000000",
+    }
+    for canal in ("A_410nm", "B_435nm", "C_460nm", "D_485nm", "E_510nm", "F_535nm",
+                  "G_560nm", "H_585nm", "R_610nm", "I_645nm", "S_680nm", "J_705nm",
+                  "T_730nm", "U_760nm", "V_810nm", "W_860nm", "K_900nm", "L_940nm"):
+        muestra[canal] = r(10, 2500)
+    return muestra
+
+
+def percentil(valores: list[float], p: float) -> float:
+    """Percentil por rango más cercano (valores ya ordenados)."""
+    if not valores:
+        return 0.0
+    k = max(0, min(len(valores) - 1, math.ceil(p / 100 * len(valores)) - 1))
+    return valores[k]
+
+
+def generar_carga(
+    enviar,
+    tasa=TASA,
+    duracion=DURACION,
+    concurrencia=CONCURRENCIA,
+    tam_lote=1,
+    crear_muestra=muestra_sintetica
+) -> dict:
+    """
+    enviar(muestra) — o enviar([muestras]) si tam_lote > 1 — se considera
+    correcto si no lanza excepción y no devuelve False.
+    """
+    latencias = []
+    errores   = 0
+    lock      = threading.Lock()
+
+    def una_llamada(programado):
+        nonlocal errores
+        carga = crear_muestra() if tam_lote == 1 else [crear_muestra() for _ in range(tam_lote)]
+        try:
+            ok = enviar(carga) is not False
+        except Exception:
+            ok = False
+        # Desde la hora prevista, no desde que hubo hilo libre
+        dt = time.perf_counter() - programado
+        with lock:
+            if ok:
+                latencias.append(dt)
+            else:
+                errores += 1
+
+    total = int(tasa * duracion)
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia, thread_name_prefix="carga") as pool:
+        for i in range(total):
+            programado = inicio + i / tasa
+            espera = programado - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+            pool.submit(una_llamada, programado)
+    transcurrido = time.perf_counter() - inicio
+
+    latencias.sort()
+
+    def ms(segundos):
+        return round(1000 * segundos, 3)
+
+    return {
+        "enviados":        total,
+        "correctos":       len(latencias),
+        "errores":         errores,
+        "segundos":        round(transcurrido, 3),
+        "muestras_por_s":  round(len(latencias) * tam_lote / transcurrido, 2) if transcurrido else 0.0,
+        "peticiones_por_s": round(len(latencias) / transcurrido, 2) if transcurrido else 0.0,
+        "latencia_ms": {
+            "p50": ms(percentil(latencias, 50)),
+            "p90": ms(percentil(latencias, 90)),
+            "p99": ms(percentil(latencias, 99)),
+            "max": ms(latencias[-1]) if latencias else 0.0,
+        },
+    }
+
+
+def main():
+    from utils.tb_client import publish_telemetry, publish_telemetry_lote
+
+    parser = argparse.ArgumentParser(description="Generador de carga para el publicador de telemetría")
+    parser.add_argument("--url", required=True, help="endpoint /datos (el lote usa <url>/lote)")
+    parser.add_argument("--tasa", type=float, default=TASA, help="peticiones por segundo")
+    parser.add_argument("--duracion", type=float, default=DURACION, help="segundos")
+    parser.add_argument("--concurrencia", type=int, default=CONCURRENCIA)
+    parser.add_argument("--lote", type=int, default=1, help="muestras por petición")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    def enviar(carga):
+        if args.lote > 1:
+            return publish_telemetry_lote(carga, url=args.url)
+        return publish_telemetry(carga, url=args.url)
+
+    resultado = generar_carga(enviar, args.tasa, args.duracion, args.concurrencia, args.lote)
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
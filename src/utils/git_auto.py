@@ -6,6 +6,21 @@ def auto_commit_and_push():
     """
     Añade y commitea automáticamente todos los cambios pendientes en el repo,
     con un mensaje que incluye timestamp. Luego hace push al remoto origin/main.
+
+    Solo para código: los CSV de muestreo están en .gitignore y se suben con
+    utils.sincronizacion.
+
+    Migración (una sola vez por estación, a mano y ANTES de hacer pull del
+    commit que deja de versionar los CSV): en clones anteriores los CSV de
+    muestreo siguen en el índice. Se sacan sin borrarlos del disco, estén
+    donde estén (la ruta es relativa al directorio desde el que se lanza
+    main.py):
+
+        git ls-files -z -- '*datos_muestreo*.csv' | xargs -0 -r git rm --cached --
+        git commit -m "Dejar de versionar datos"
+
+    Si no, el pull choca (modificado aquí / borrado arriba) o el CSV vivo
+    desaparece del árbol.
     """
     # Directorio raíz del repo (supone que git_auto.py está en src/utils)
     repo_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -35,3 +50,4 @@ def auto_commit_and_push():
 
     except Exception as e:
         log.warning("Auto-commit/push falló: %s", e, exc_info=True)
+
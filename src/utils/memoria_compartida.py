@@ -0,0 +1,200 @@
+# utils/memoria_compartida.py
+"""
+Última muestra en memoria compartida
+------------------------------------
+La estación publica cada muestra en un fichero mapeado en memoria
+(/dev/shm en Linux) con disposición fija derivada de CAMPOS_EXPORT; otros
+procesos locales (kiosko, riego...) la leen con mmap sin tocar sensores,
+CSV ni red.
+
+Disposición (little-endian), un fichero por estación:
+
+  Cabecera (64 B):  MAGIA | VERSION | nº campos | capacidad | firma (crc32
+                    de los nombres de campo) | nº de escrituras | station_id
+  Ranura × capacidad (historial circular):
+                    secuencia | nº de muestra | valores float64 (NaN = falta)
+                    | git_commit (40 B, UTF-8)
+
+Cada ranura lleva un seqlock: el escritor pone la secuencia impar, escribe
+y la deja par; el lector copia la ranura y la da por buena solo si la
+secuencia era par y no cambió. El escritor nunca espera a los lectores.
+
+Si el publicador se reinicia crea un fichero nuevo: los lectores deben
+volver a abrirlo (LectorMemoria.reabrir()).
+
+Uso:  python -m utils.memoria_compartida [station_id]
+"""
+
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+
+from utils.esquema import CAMPOS_EXPORT, STATION_ID_POR_DEFECTO
+
+log = logging.getLogger(__name__)
+
+DIRECTORIO = os.environ.get(
+    "TFM_MEMORIA_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+)
+HISTORIAL  = 360     # muestras en el anillo (~1 h a 10 s)
+
+MAGIA      = b"TFMM"
+VERSION    = 1
+TAM_TEXTO  = 40      # git_commit completo (SHA-1 en hex)
+MAX_REINTENTOS = 1000
+
+CAMPOS_TEXTO    = ("git_commit",)
+CAMPOS_NUMERICOS = tuple(c for c in CAMPOS_EXPORT if c not in CAMPOS_TEXTO)
+FIRMA = zlib.crc32(",".join(CAMPOS_EXPORT).encode("utf-8"))
+
+CABECERA     = struct.Struct("<4sHHIIQ32s")
+TAM_CABECERA = 64
+OFS_ESCRITURAS = 16                      # posición del contador en la cabecera
+SECUENCIA    = struct.Struct("<Q")
+RANURA       = struct.Struct(f"<QQ{len(CAMPOS_NUMERICOS)}d{TAM_TEXTO}s")
+
+
+def ruta_memoria(station_id: str = STATION_ID_POR_DEFECTO, directorio: str | None = None) -> str:
+    return os.path.join(directorio or DIRECTORIO, f"tfm_muestra_{station_id}")
+
+
+def _a_float(v) -> float:
+    if isinstance(v, bool):
+        return float(v)
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+# ---------- ESCRITOR ----------
+class PublicadorMemoria:
+    """Un solo escritor por estación (el sumidero del pipeline)."""
+
+    def __init__(self, station_id=STATION_ID_POR_DEFECTO, ruta=None, capacidad=HISTORIAL):
+        self.station_id = station_id
+        self.ruta       = ruta or ruta_memoria(station_id)
+        self.capacidad  = capacidad
+        self._n         = 0
+        tam = TAM_CABECERA + capacidad * RANURA.size
+
+        # Fichero nuevo + os.replace: un lector nunca ve una cabecera a medias
+        tmp = f"{self.ruta}.tmp"
+        with open(tmp, "w+b") as f:
+            f.truncate(tam)
+            self._mm = mmap.mmap(f.fileno(), tam)
+        CABECERA.pack_into(self._mm, 0, MAGIA, VERSION, len(CAMPOS_EXPORT), capacidad,
+                           FIRMA, 0, station_id.encode("utf-8")[:32])
+        os.replace(tmp, self.ruta)
+
+    def publicar(self, datos: dict) -> None:
+        n = self._n
+        ofs = TAM_CABECERA + (n % self.capacidad) * RANURA.size
+        seq, = SECUENCIA.unpack_from(self._mm, ofs)
+
+        SECUENCIA.pack_into(self._mm, ofs, seq + 1)          # impar: escribiendo
+        texto = str(datos.get("git_commit") or "").encode("utf-8")[:TAM_TEXTO]
+        RANURA.pack_into(self._mm, ofs, seq + 1, n,
+                         *(_a_float(datos.get(c)) for c in CAMPOS_NUMERICOS), texto)
+        SECUENCIA.pack_into(self._mm, ofs, seq + 2)          # par: estable
+
+        self._n = n + 1
+        struct.pack_into("<Q", self._mm, OFS_ESCRITURAS, self._n)
+
+    def cerrar(self, borrar=False) -> None:
+        self._mm.close()
+        if borrar:
+            try:
+                os.unlink(self.ruta)
+            except FileNotFoundError:
+                pass
+
+
+# ---------- LECTOR ----------
+class LectorMemoria:
+    """Lector sin bloqueos; puede haber tantos como se quiera."""
+
+    def __init__(self, station_id=STATION_ID_POR_DEFECTO, ruta=None):
+        self.ruta = ruta or ruta_memoria(station_id)
+        self._mm = None
+        self.reabrir()
+
+    def reabrir(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+        with open(self.ruta, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magia, version, n_campos, capacidad, firma, _, sid = CABECERA.unpack_from(self._mm, 0)
+        if magia != MAGIA or version != VERSION:
+            raise ValueError(f"{self.ruta}: no es una región de muestras v{VERSION}")
+        if n_campos != len(CAMPOS_EXPORT) or firma != FIRMA:
+            raise ValueError(f"{self.ruta}: CAMPOS_EXPORT no coincide con el del publicador")
+        self.capacidad  = capacidad
+        self.station_id = sid.rstrip(b"\0").decode("utf-8")
+
+    @property
+    def escrituras(self) -> int:
+        return struct.unpack_from("<Q", self._mm, OFS_ESCRITURAS)[0]
+
+    def _leer_ranura(self, numero: int) -> dict | None:
+        """Muestra 'numero' si sigue en el anillo y se pudo leer coherente."""
+        ofs = TAM_CABECERA + (numero % self.capacidad) * RANURA.size
+        for _ in range(MAX_REINTENTOS):
+            crudo = self._mm[ofs:ofs + RANURA.size]     # copia de la ranura
+            seq, n, *valores = RANURA.unpack(crudo)
+            if seq & 1 or SECUENCIA.unpack_from(self._mm, ofs)[0] != seq:
+                continue                                # el escritor estaba en ella
+            if n != numero:
+                return None                             # ya sobrescrita
+            texto = valores.pop().rstrip(b"\0").decode("utf-8", "replace")
+            muestra = {"station_id": self.station_id}
+            for campo, v in zip(CAMPOS_NUMERICOS, valores):
+                if not math.isnan(v):
+                    muestra[campo] = v
+            if texto:
+                muestra["git_commit"] = texto
+            return muestra
+        log.warning("Ranura %d de %s ocupada tras %d intentos", numero, self.ruta, MAX_REINTENTOS)
+        return None
+
+    def ultima(self) -> dict | None:
+        """Muestra más reciente, o None si aún no se ha publicado ninguna."""
+        while True:
+            n = self.escrituras
+            if n == 0:
+                return None
+            muestra = self._leer_ranura(n - 1)
+            if muestra is not None or self.escrituras == n:
+                return muestra
+            # El escritor dio la vuelta completa mientras leíamos: otra vez
+
+    def historial(self, cuantas: int | None = None) -> list[dict]:
+        """Últimas muestras, de la más antigua a la más reciente."""
+        n = self.escrituras
+        cuantas = self.capacidad if cuantas is None else min(cuantas, self.capacidad)
+        out = []
+        for numero in range(max(0, n - cuantas), n):
+            muestra = self._leer_ranura(numero)
+            if muestra is not None:
+                out.append(muestra)
+        return out
+
+    def cerrar(self) -> None:
+        self._mm.close()
+
+
+def main():
+    lector = LectorMemoria(sys.argv[1] if len(sys.argv) > 1 else STATION_ID_POR_DEFECTO)
+    print(json.dumps(lector.ultima(), indent=2, ensure_ascii=False))
+    lector.cerrar()
+
+
+if __name__ == "__main__":
+    main()
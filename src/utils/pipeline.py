@@ -0,0 +1,251 @@
+# utils/pipeline.py
+"""
+Pipeline de sumideros
+---------------------
+La adquisición publica cada muestra una sola vez; cada sumidero (CSV, HTTP,
+pantalla, ...) la consume desde su propia cola acotada en un hilo propio,
+así un sumidero lento no retrasa la siguiente lectura.
+
+Política al llenarse la cola:
+  • "bloquear"          → espera hueco (hasta timeout_bloqueo; después descarta)
+  • "descartar_antiguo" → tira la muestra más antigua de la cola
+  • "volcar_disco"      → añade la muestra a un fichero JSON-lines y la
+                          procesa cuando la cola se vacía (en orden)
+
+Las muestras se comparten entre sumideros: ningún sumidero debe modificarlas.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+POLITICAS = ("bloquear", "descartar_antiguo", "volcar_disco")
+
+CAPACIDAD       = 100
+POLITICA        = "descartar_antiguo"
+TIMEOUT_BLOQUEO = 5.0   # segundos
+
+
+class Sumidero:
+    """Un consumidor con cola acotada, hilo propio y contadores."""
+
+    def __init__(
+        self,
+        nombre: str,
+        fn,
+        capacidad=CAPACIDAD,
+        politica=POLITICA,
+        ruta_volcado=None,
+        timeout_bloqueo=TIMEOUT_BLOQUEO
+    ):
+        if politica not in POLITICAS:
+            raise ValueError(f"Política desconocida: {politica} (válidas: {POLITICAS})")
+        if politica == "volcar_disco" and not ruta_volcado:
+            raise ValueError("La política 'volcar_disco' necesita ruta_volcado")
+
+        self.nombre          = nombre
+        self.fn              = fn
+        self.politica        = politica
+        self.ruta_volcado    = ruta_volcado
+        self.timeout_bloqueo = timeout_bloqueo
+
+        self._cola     = queue.Queue(maxsize=capacidad)
+        self._lock     = threading.Lock()
+        self._activo   = True
+        self._pausado  = False
+        self._volcando = bool(ruta_volcado) and (
+            os.path.isfile(ruta_volcado) or os.path.isfile(f"{ruta_volcado}.procesando")
+        )
+
+        # Contadores
+        self._inicio      = time.monotonic()
+        self.recibidas    = 0
+        self.procesadas   = 0
+        self.descartadas  = 0
+        self.volcadas     = 0
+        self.errores      = 0
+        self._tiempo_fn   = 0.0
+
+        self._hilo = threading.Thread(target=self._bucle, name=f"sumidero-{nombre}", daemon=True)
+        self._hilo.start()
+
+    # ---------- PRODUCTOR ----------
+    def entregar(self, muestra: dict) -> None:
+        with self._lock:
+            self.recibidas += 1
+            if self._pausado:
+                self.descartadas += 1
+                return
+            # Mientras haya volcado pendiente, lo nuevo va detrás (orden)
+            if self._volcando:
+                self._volcar(muestra)
+                return
+
+        try:
+            self._cola.put_nowait(muestra)
+            return
+        except queue.Full:
+            pass
+
+        if self.politica == "bloquear":
+            try:
+                self._cola.put(muestra, timeout=self.timeout_bloqueo)
+            except queue.Full:
+                with self._lock:
+                    self.descartadas += 1
+                log.warning("Sumidero %s: cola llena tras %.1fs, muestra descartada",
+                            self.nombre, self.timeout_bloqueo)
+
+        elif self.politica == "descartar_antiguo":
+            with self._lock:
+                try:
+                    self._cola.get_nowait()
+                    self.descartadas += 1
+                except queue.Empty:
+                    pass
+                try:
+                    self._cola.put_nowait(muestra)
+                except queue.Full:
+                    self.descartadas += 1
+
+        else:  # volcar_disco
+            with self._lock:
+                self._volcar(muestra)
+
+    def _volcar(self, muestra: dict) -> None:
+        # Llamar con self._lock adquirido
+        try:
+            with open(self.ruta_volcado, "a", encoding="utf-8") as f:
+                f.write(json.dumps(muestra, default=str) + "\n")
+            self.volcadas  += 1
+            self._volcando = True
+        except Exception:
+            self.descartadas += 1
+            log.error("Sumidero %s: no se pudo volcar a %s", self.nombre,
+                      self.ruta_volcado, exc_info=True)
+
+    # ---------- CONSUMIDOR ----------
+    def _bucle(self) -> None:
+        while True:
+            try:
+                muestra = self._cola.get(timeout=0.5)
+            except queue.Empty:
+                if self._volcando:
+                    self._recuperar_volcado()
+                    continue
+                if not self._activo:
+                    return
+                continue
+            self._procesar(muestra)
+
+    def _recuperar_volcado(self) -> None:
+        # Renombrar bajo el lock: lo que llegue a partir de ahora va a la cola.
+        # Un '.procesando' previo (corte a medias) se termina antes que nada.
+        pendiente = f"{self.ruta_volcado}.procesando"
+        with self._lock:
+            if not os.path.isfile(pendiente) and os.path.isfile(self.ruta_volcado):
+                os.replace(self.ruta_volcado, pendiente)
+            self._volcando = os.path.isfile(self.ruta_volcado)
+
+        if not os.path.isfile(pendiente):
+            return
+        with open(pendiente, "r", encoding="utf-8") as f:
+            for linea in f:
+                if not linea.strip():
+                    continue
+                try:
+                    muestra = json.loads(linea)
+                except ValueError:
+                    log.error("Sumidero %s: línea corrupta en volcado, se ignora", self.nombre)
+                    continue
+                self._procesar(muestra)
+        os.remove(pendiente)
+
+    def _procesar(self, muestra: dict) -> None:
+        t0 = time.perf_counter()
+        try:
+            self.fn(muestra)
+            ok = True
+        except Exception:
+            ok = False
+            log.error("Error en sumidero %s", self.nombre, exc_info=True)
+        dt = time.perf_counter() - t0
+        with self._lock:
+            self._tiempo_fn += dt
+            if ok:
+                self.procesadas += 1
+            else:
+                self.errores += 1
+
+    # ---------- CONTROL ----------
+    def pausar(self) -> None:
+        with self._lock:
+            self._pausado = True
+        log.info("Sumidero %s en pausa", self.nombre)
+
+    def reanudar(self) -> None:
+        with self._lock:
+            self._pausado = False
+        log.info("Sumidero %s reanudado", self.nombre)
+
+    @property
+    def pausado(self) -> bool:
+        return self._pausado
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            tratadas = self.procesadas + self.errores
+            transcurrido = time.monotonic() - self._inicio
+            return {
+                "recibidas":      self.recibidas,
+                "procesadas":     self.procesadas,
+                "descartadas":    self.descartadas,
+                "volcadas":       self.volcadas,
+                "errores":        self.errores,
+                "en_cola":        self._cola.qsize(),
+                "pausado":        self._pausado,
+                "por_segundo":    round(self.procesadas / transcurrido, 3) if transcurrido else 0.0,
+                "ms_por_muestra": round(1000 * self._tiempo_fn / tratadas, 3) if tratadas else 0.0,
+            }
+
+    def detener(self, timeout: float = 5.0) -> None:
+        """Procesa lo pendiente (hasta 'timeout') y termina el hilo."""
+        self._activo = False
+        self._hilo.join(timeout)
+        if self._hilo.is_alive():
+            log.warning("Sumidero %s: %d muestras sin procesar al detener",
+                        self.nombre, self._cola.qsize())
+
+
+class PipelineSumideros:
+    """Reparte cada muestra publicada a todos los sumideros registrados."""
+
+    def __init__(self):
+        self._sumideros = {}
+
+    def agregar(self, nombre: str, fn, **opciones) -> Sumidero:
+        if nombre in self._sumideros:
+            raise ValueError(f"Sumidero duplicado: {nombre}")
+        sumidero = Sumidero(nombre, fn, **opciones)
+        self._sumideros[nombre] = sumidero
+        log.info("Sumidero %s registrado (política=%s)", nombre, sumidero.politica)
+        return sumidero
+
+    def sumidero(self, nombre: str) -> Sumidero:
+        return self._sumideros[nombre]
+
+    def publicar(self, muestra: dict) -> None:
+        for sumidero in self._sumideros.values():
+            sumidero.entregar(muestra)
+
+    def estadisticas(self) -> dict:
+        return {nombre: s.estadisticas() for nombre, s in self._sumideros.items()}
+
+    def detener(self, timeout: float = 5.0) -> None:
+        for sumidero in self._sumideros.values():
+            sumidero.detener(timeout)
@@ -0,0 +1,71 @@
+# utils/reloj.py
+"""
+Reloj inyectable
+----------------
+Todo lo que espera o mide tiempo (bucle de muestreo, reintentos del
+espectral, pulso del actuador, permanencia mínima del ventilador) lo hace a
+través de un reloj:
+
+  RelojSistema  → time.monotonic/time.time/time.sleep de siempre
+  RelojSimulado → el tiempo solo avanza al dormir o con avanzar(); los
+                  temporizadores vencidos se ejecutan en orden, en el acto.
+                  Semanas de funcionamiento se simulan en segundos.
+
+Los temporizadores del reloj simulado los aportan "suscriptores" (p. ej.
+control.planificador.PlanificadorActuadores) con dos métodos:
+proximo_vencimiento() → float | None  y  ejecutar_vencidas().
+"""
+
+import time
+
+
+class RelojSistema:
+    simulado = False
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def time(self) -> float:
+        return time.time()
+
+    def dormir(self, segundos: float) -> None:
+        time.sleep(segundos)
+
+
+class RelojSimulado:
+    simulado = True
+
+    def __init__(self, inicio: float = 0.0, epoch: float = 1_700_000_000.0):
+        self._ahora  = float(inicio)
+        self._epoch  = float(epoch) - float(inicio)
+        self._suscriptores = []
+
+    def suscribir(self, suscriptor) -> None:
+        self._suscriptores.append(suscriptor)
+
+    def monotonic(self) -> float:
+        return self._ahora
+
+    def time(self) -> float:
+        return self._epoch + self._ahora
+
+    def avanzar(self, segundos: float) -> None:
+        """Avanza el tiempo ejecutando, en orden, los temporizadores que venzan."""
+        objetivo = self._ahora + max(0.0, segundos)
+        while True:
+            siguiente, suscriptor = None, None
+            for s in self._suscriptores:
+                t = s.proximo_vencimiento()
+                if t is not None and t <= objetivo and (siguiente is None or t < siguiente):
+                    siguiente, suscriptor = t, s
+            if suscriptor is None:
+                break
+            self._ahora = max(self._ahora, siguiente)
+            suscriptor.ejecutar_vencidas()
+        self._ahora = objetivo
+
+    def dormir(self, segundos: float) -> None:
+        self.avanzar(segundos)
+
+
+RELOJ_SISTEMA = RelojSistema()
@@ -0,0 +1,165 @@
+# utils/salud_host.py
+"""
+Salud del host (CM4)
+--------------------
+Lee temperatura del SoC, carga y memoria disponible con descriptores
+persistentes (un open() por fichero en todo el proceso) y clasifica el
+estado en tres niveles:
+
+  normal    → funcionamiento completo
+  degradado → se recorta trabajo prescindible (ver main.aplicar_nivel_salud)
+  critico   → se recorta todo lo que no sea adquisición básica y control
+
+Para volver a un nivel inferior hay que bajar 'histeresis' °C por debajo del
+umbral, así no se oscila alrededor del límite.
+"""
+
+import logging
+import os
+
+log = logging.getLogger(__name__)
+
+RUTA_TEMPERATURA = "/sys/class/thermal/thermal_zone0/temp"
+RUTA_CARGA       = "/proc/loadavg"
+RUTA_MEMORIA     = "/proc/meminfo"
+
+NIVELES = ("normal", "degradado", "critico")
+
+# Umbrales por defecto (el CM4 empieza a limitar frecuencia a 80 °C)
+TEMP_DEGRADADO   = 70.0    # °C
+TEMP_CRITICO     = 78.0    # °C
+HISTERESIS       = 5.0     # °C
+CARGA_DEGRADADO  = 1.5     # carga media 1 min por núcleo
+MEMORIA_CRITICA  = 64.0    # MB disponibles
+
+
+class LectorPersistente:
+    """Fichero de /sys o /proc abierto una vez y releído con seek(0)."""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._f = None
+
+    def leer(self) -> str | None:
+        try:
+            if self._f is None:
+                self._f = open(self.ruta, "r")
+            self._f.seek(0)
+            return self._f.read()
+        except OSError:
+            # Se reabre en la próxima lectura
+            self.cerrar()
+            return None
+
+    def cerrar(self) -> None:
+        if self._f is not None:
+            try:
+                self._f.close()
+            except OSError:
+                pass
+            self._f = None
+
+
+class MonitorSaludHost:
+    """
+    evaluar() lee los sensores del host, recalcula el nivel y, si cambia,
+    avisa a las funciones registradas con al_cambiar(fn(nivel, lectura)).
+    """
+
+    def __init__(
+        self,
+        temp_degradado=TEMP_DEGRADADO,
+        temp_critico=TEMP_CRITICO,
+        histeresis=HISTERESIS,
+        carga_degradado=CARGA_DEGRADADO,
+        memoria_critica=MEMORIA_CRITICA,
+        ruta_temperatura=RUTA_TEMPERATURA,
+        ruta_carga=RUTA_CARGA,
+        ruta_memoria=RUTA_MEMORIA
+    ):
+        self.temp_degradado  = temp_degradado
+        self.temp_critico    = temp_critico
+        self.histeresis      = histeresis
+        self.carga_degradado = carga_degradado * (os.cpu_count() or 1)
+        self.memoria_critica = memoria_critica
+
+        self._temperatura = LectorPersistente(ruta_temperatura)
+        self._carga       = LectorPersistente(ruta_carga)
+        self._memoria     = LectorPersistente(ruta_memoria)
+
+        self.nivel   = "normal"
+        self.lectura = {}
+        self._oyentes = []
+
+    def al_cambiar(self, fn) -> None:
+        self._oyentes.append(fn)
+
+    # ---------- LECTURAS ----------
+    def leer(self) -> dict:
+        lectura = {"temperatura_cpu": None, "carga_1m": None, "memoria_disponible_mb": None}
+
+        txt = self._temperatura.leer()
+        if txt:
+            try:
+                lectura["temperatura_cpu"] = int(txt.strip()) / 1000.0
+            except ValueError:
+                pass
+
+        txt = self._carga.leer()
+        if txt:
+            try:
+                lectura["carga_1m"] = float(txt.split()[0])
+            except (ValueError, IndexError):
+                pass
+
+        txt = self._memoria.leer()
+        if txt:
+            for linea in txt.splitlines():
+                if linea.startswith("MemAvailable:"):
+                    lectura["memoria_disponible_mb"] = int(linea.split()[1]) / 1024.0
+                    break
+
+        return lectura
+
+    # ---------- NIVEL ----------
+    def _nivel_objetivo(self, lectura: dict) -> str:
+        temp  = lectura["temperatura_cpu"]
+        carga = lectura["carga_1m"]
+        mem   = lectura["memoria_disponible_mb"]
+
+        # Al bajar de nivel se exige margen de histéresis
+        margen_critico   = self.histeresis if self.nivel == "critico" else 0.0
+        margen_degradado = self.histeresis if self.nivel != "normal" else 0.0
+
+        if temp is not None and temp >= self.temp_critico - margen_critico:
+            return "critico"
+        if mem is not None and mem < self.memoria_critica:
+            return "critico"
+        if temp is not None and temp >= self.temp_degradado - margen_degradado:
+            return "degradado"
+        if carga is not None and carga >= self.carga_degradado:
+            return "degradado"
+        return "normal"
+
+    def evaluar(self) -> dict:
+        lectura = self.leer()
+        self.lectura = lectura
+        nuevo = self._nivel_objetivo(lectura)
+
+        if nuevo != self.nivel:
+            log.warning("Salud del host: %s → %s (temp=%s °C, carga=%s, mem=%s MB)",
+                        self.nivel, nuevo, lectura["temperatura_cpu"],
+                        lectura["carga_1m"], lectura["memoria_disponible_mb"])
+            self.nivel = nuevo
+            for fn in self._oyentes:
+                try:
+                    fn(nuevo, lectura)
+                except Exception:
+                    log.error("Error aplicando nivel de salud %s", nuevo, exc_info=True)
+
+        return lectura
+
+    def cerrar(self) -> None:
+        self._temperatura.cerrar()
+        self._carga.cerrar()
+        self._memoria.cerrar()
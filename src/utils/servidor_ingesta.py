@@ -0,0 +1,214 @@
+# utils/servidor_ingesta.py
+"""
+Servidor de ingesta local
+-------------------------
+Sustituto en local del backend Flask del VPS para probar y medir el
+publicador sin red. Implementa:
+
+  POST /datos          una muestra (JSON)            → 200 {"ok": true}
+  POST /datos/lote     lista de muestras (JSON)      → 200 {"recibidas": n}
+  POST /datos/bin      trama de utils.codificacion   → 200 {"ok": true}
+  POST /sync           protocolo de utils.sincronizacion
+  GET  /estadisticas   contadores
+  POST /control        cambia los fallos en caliente:
+                       {"latencia": s, "tasa_error": 0..1, "caido": bool,
+                        "caida_segundos": s}
+
+Los fallos inyectados (latencia, errores 500 aleatorios y caídas con 503)
+no afectan a /estadisticas ni a /control.
+
+Uso:  python -m utils.servidor_ingesta --puerto 5000 --latencia 0.05 --tasa-error 0.01
+      TFM_VPS_URL=http://127.0.0.1:5000/datos python main.py
+"""
+
+import argparse
+import hashlib
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+from flask import Flask, jsonify, request
+
+from utils.codificacion import DecodificadorTelemetria, ErrorTrama
+
+log = logging.getLogger(__name__)
+
+HOST   = "127.0.0.1"
+PUERTO = 5000
+MAX_MUESTRAS_GUARDADAS = 10_000   # se guardan solo las últimas (memoria acotada)
+
+RUTAS_SIN_FALLOS = ("/estadisticas", "/control")
+
+
+class EstadoIngesta:
+    """Muestras recibidas, contadores y configuración de fallos."""
+
+    def __init__(self, latencia=0.0, tasa_error=0.0, caido=False, semilla=None):
+        self.latencia    = latencia
+        self.tasa_error  = tasa_error
+        self.caido       = caido
+        self.caida_hasta = 0.0
+
+        self.muestras    = deque(maxlen=MAX_MUESTRAS_GUARDADAS)
+        self.sync        = {}       # archivo → bytes recibidos
+        self.contadores  = {"peticiones": 0, "muestras": 0, "lotes": 0, "bytes_binarios": 0,
+                            "tramas_rechazadas": 0, "errores_inyectados": 0,
+                            "rechazadas_caida": 0}
+        self.decodificador = DecodificadorTelemetria()
+        self._azar       = random.Random(semilla)
+        self._lock       = threading.Lock()
+
+    def fallo(self):
+        """Devuelve (código, mensaje) si la petición debe fallar, o None."""
+        with self._lock:
+            self.contadores["peticiones"] += 1
+            if self.caido or time.monotonic() < self.caida_hasta:
+                self.contadores["rechazadas_caida"] += 1
+                return 503, "servidor caído (simulado)"
+            if self.tasa_error and self._azar.random() < self.tasa_error:
+                self.contadores["errores_inyectados"] += 1
+                return 500, "error simulado"
+        return None
+
+    def guardar(self, muestras: list[dict], lote: bool) -> None:
+        with self._lock:
+            self.muestras.extend(muestras)
+            self.contadores["muestras"] += len(muestras)
+            if lote:
+                self.contadores["lotes"] += 1
+
+
+def crear_app(latencia=0.0, tasa_error=0.0, caido=False, semilla=None) -> Flask:
+    app = Flask(__name__)
+    estado = EstadoIngesta(latencia, tasa_error, caido, semilla)
+    app.config["INGESTA"] = estado
+
+    @app.before_request
+    def inyectar_fallos():
+        if request.path in RUTAS_SIN_FALLOS:
+            return None
+        if estado.latencia:
+            time.sleep(estado.latencia)
+        fallo = estado.fallo()
+        if fallo:
+            codigo, msg = fallo
+            return jsonify({"error": msg}), codigo
+        return None
+
+    @app.post("/datos")
+    def datos():
+        muestra = request.get_json(silent=True)
+        if not isinstance(muestra, dict):
+            return jsonify({"error": "se esperaba un objeto JSON"}), 400
+        estado.guardar([muestra], lote=False)
+        return jsonify({"ok": True})
+
+    @app.post("/datos/lote")
+    def datos_lote():
+        muestras = request.get_json(silent=True)
+        if not isinstance(muestras, list) or not all(isinstance(m, dict) for m in muestras):
+            return jsonify({"error": "se esperaba una lista de objetos JSON"}), 400
+        estado.guardar(muestras, lote=True)
+        return jsonify({"recibidas": len(muestras)})
+
+    @app.post("/datos/bin")
+    def datos_bin():
+        trama = request.get_data()
+        with estado._lock:
+            try:
+                muestra = estado.decodificador.decodificar(trama)
+            except ErrorTrama as e:
+                estado.contadores["tramas_rechazadas"] += 1
+                return jsonify({"error": str(e)}), 422
+            estado.contadores["bytes_binarios"] += len(trama)
+        estado.guardar([muestra], lote=False)
+        return jsonify({"ok": True})
+
+    @app.post("/sync")
+    def sync():
+        cuerpo = request.get_json(silent=True) or {}
+        try:
+            archivo   = cuerpo["archivo"]
+            offset    = int(cuerpo["offset"])
+            contenido = cuerpo["contenido"].encode("utf-8")
+        except (KeyError, TypeError, ValueError):
+            return jsonify({"error": "petición de sincronización incompleta"}), 400
+        if hashlib.sha256(contenido).hexdigest() != cuerpo.get("sha256"):
+            return jsonify({"error": "sha256 no coincide"}), 400
+
+        with estado._lock:
+            actual = estado.sync.get(archivo, b"")
+            if offset != len(actual):
+                return jsonify({"offset": len(actual)}), 409
+            estado.sync[archivo] = actual + contenido
+            return jsonify({"offset": offset + len(contenido)})
+
+    @app.get("/estadisticas")
+    def estadisticas():
+        with estado._lock:
+            return jsonify({**estado.contadores,
+                            "latencia": estado.latencia,
+                            "tasa_error": estado.tasa_error,
+                            "caido": estado.caido or time.monotonic() < estado.caida_hasta})
+
+    @app.post("/control")
+    def control():
+        cfg = request.get_json(silent=True) or {}
+        with estado._lock:
+            if "latencia" in cfg:
+                estado.latencia = float(cfg["latencia"])
+            if "tasa_error" in cfg:
+                estado.tasa_error = float(cfg["tasa_error"])
+            if "caido" in cfg:
+                estado.caido = bool(cfg["caido"])
+            if "caida_segundos" in cfg:
+                estado.caida_hasta = time.monotonic() + float(cfg["caida_segundos"])
+        log.info("Fallos de ingesta actualizados: %s", cfg)
+        return jsonify({"ok": True})
+
+    return app
+
+
+class ServidorIngesta:
+    """Arranca crear_app() en un hilo (para tests y mediciones)."""
+
+    def __init__(self, host=HOST, puerto=0, **fallos):
+        from werkzeug.serving import make_server
+
+        self.app = crear_app(**fallos)
+        self._srv = make_server(host, puerto, self.app, threaded=True)
+        self.url = f"http://{host}:{self._srv.server_port}"
+        self._hilo = threading.Thread(target=self._srv.serve_forever, name="servidor-ingesta",
+                                      daemon=True)
+
+    @property
+    def estado(self) -> EstadoIngesta:
+        return self.app.config["INGESTA"]
+
+    def iniciar(self) -> "ServidorIngesta":
+        self._hilo.start()
+        return self
+
+    def detener(self) -> None:
+        self._srv.shutdown()
+        self._hilo.join(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de ingesta local (sustituto del VPS)")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos añadidos por petición")
+    parser.add_argument("--tasa-error", type=float, default=0.0, help="fracción de peticiones con 500")
+    parser.add_argument("--caido", action="store_true", help="arrancar respondiendo 503")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    app = crear_app(args.latencia, args.tasa_error, args.caido)
+    app.run(host=args.host, port=args.puerto, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# utils/sincronizacion.py
+"""
+Sincronización incremental de datos
+-----------------------------------
+Sube al servidor solo las filas nuevas de los CSV de muestreo, en bloques,
+recordando por fichero el último byte confirmado. Sustituye al auto-commit
+de git para los datos: el código se versiona con git y los datos viajan por
+aquí.
+
+Protocolo (POST JSON a URL_SINCRONIZACION):
+
+  → {"archivo", "offset", "fin", "filas", "cabecera", "contenido", "sha256"}
+  ← 200 {"offset": fin}             bloque aceptado
+  ← 409 {"offset": n}               el servidor ya tiene hasta 'n' (p. ej. se
+                                    perdió un ACK): se continúa desde ahí
+
+'contenido' son las líneas CSV completas entre offset y fin; 'sha256' su hash.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import requests
+
+log = logging.getLogger(__name__)
+
+URL_SINCRONIZACION = os.environ.get("TFM_SYNC_URL", "http://217.154.101.202:5000/sync")
+RUTA_ESTADO        = "estado_sincronizacion.json"
+FILAS_POR_BLOQUE   = 500
+PERIODO            = 300     # segundos entre sincronizaciones
+TIMEOUT            = 10      # segundos por petición
+
+
+class SincronizadorDatos:
+    """
+    Sube de forma incremental los ficheros que casan con 'patron'.
+    El estado ({ruta: {"offset", "filas", "cabecera_sha256"}}) se guarda de
+    forma atómica tras cada bloque confirmado, así un corte solo repite,
+    como mucho, el último bloque (y el servidor lo detecta por el offset).
+    """
+
+    def __init__(
+        self,
+        patron: str,
+        url=URL_SINCRONIZACION,
+        ruta_estado=RUTA_ESTADO,
+        filas_por_bloque=FILAS_POR_BLOQUE,
+        timeout=TIMEOUT
+    ):
+        self.patron           = patron
+        self.url              = url
+        self.ruta_estado      = ruta_estado
+        self.filas_por_bloque = filas_por_bloque
+        self.timeout          = timeout
+        self.periodo          = PERIODO
+
+        self._sesion  = requests.Session()
+        self._lock    = threading.Lock()
+        self._parar   = threading.Event()
+        self._hilo    = None
+        self.estado   = self._cargar_estado()
+
+    # ---------- ESTADO ----------
+    def _cargar_estado(self) -> dict:
+        try:
+            with open(self.ruta_estado, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception:
+            log.error("Estado de sincronización ilegible, se empieza de cero", exc_info=True)
+            return {}
+
+    def _guardar_estado(self) -> None:
+        tmp = f"{self.ruta_estado}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.estado, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.ruta_estado)
+
+    # ---------- SINCRONIZACIÓN ----------
+    def sincronizar(self) -> int:
+        """Sube todo lo pendiente. Devuelve el nº de filas confirmadas."""
+        with self._lock:
+            total = 0
+            for ruta in sorted(glob.glob(self.patron)):
+                try:
+                    total += self._sincronizar_fichero(ruta)
+                except requests.RequestException as e:
+                    log.warning("Sincronización de %s interrumpida: %s", ruta, e)
+                    break
+                except Exception:
+                    log.error("Error sincronizando %s", ruta, exc_info=True)
+            if total:
+                log.info("Sincronizadas %d filas nuevas", total)
+            return total
+
+    def _sincronizar_fichero(self, ruta: str) -> int:
+        clave = os.path.abspath(ruta)
+        archivo = os.path.basename(ruta)
+        subidas = 0
+
+        with open(ruta, "rb") as f:
+            cabecera = f.readline()
+            cab_sha = hashlib.sha256(cabecera).hexdigest()
+            tam = os.fstat(f.fileno()).st_size
+
+            info = self.estado.get(clave)
+            # Fichero nuevo, truncado o sustituido → desde el principio
+            if info is None or info["offset"] > tam or info["cabecera_sha256"] != cab_sha:
+                if info is not None:
+                    log.warning("%s ha cambiado (truncado o rotado); se sube desde el inicio", archivo)
+                info = {"offset": 0, "filas": 0, "cabecera_sha256": cab_sha}
+                self.estado[clave] = info
+
+            while True:
+                f.seek(info["offset"])
+                lineas = []
+                for linea in f:
+                    if not linea.endswith(b"\n"):
+                        break          # fila a medio escribir: en la próxima vuelta
+                    lineas.append(linea)
+                    if len(lineas) >= self.filas_por_bloque:
+                        break
+                if not lineas:
+                    return subidas
+
+                contenido = b"".join(lineas)
+                fin = info["offset"] + len(contenido)
+                aceptado = self._enviar_bloque(archivo, info["offset"], fin, len(lineas),
+                                               cabecera, contenido)
+
+                if aceptado == fin:
+                    info["filas"] += len(lineas)
+                    subidas += len(lineas)
+                elif 0 <= aceptado <= tam and aceptado != info["offset"]:
+                    log.warning("%s: el servidor tiene hasta el byte %d (local %d), se reanuda ahí",
+                                archivo, aceptado, info["offset"])
+                else:
+                    raise ValueError(f"{archivo}: offset confirmado incoherente ({aceptado})")
+
+                info["offset"] = aceptado
+                self._guardar_estado()
+
+    def _enviar_bloque(self, archivo, offset, fin, filas, cabecera: bytes, contenido: bytes) -> int:
+        cuerpo = {
+            "archivo":   archivo,
+            "offset":    offset,
+            "fin":       fin,
+            "filas":     filas,
+            "cabecera":  cabecera.decode("utf-8").rstrip("\r\n"),
+            "contenido": contenido.decode("utf-8"),
+            "sha256":    hashlib.sha256(contenido).hexdigest(),
+        }
+        r = self._sesion.post(self.url, json=cuerpo, timeout=self.timeout)
+        if r.status_code == 409:
+            return int(r.json()["offset"])
+        r.raise_for_status()
+        return int(r.json()["offset"])
+
+    # ---------- SEGUNDO PLANO ----------
+    def iniciar(self, periodo=None) -> None:
+        """Sincroniza cada 'periodo' segundos en un hilo propio."""
+        if periodo is not None:
+            self.periodo = periodo
+
+        def bucle():
+            while not self._parar.is_set():
+                self.sincronizar()
+                self._parar.wait(self.periodo)
+
+        self._hilo = threading.Thread(target=bucle, name="sincronizacion", daemon=True)
+        self._hilo.start()
+
+    def detener(self) -> None:
+        self._parar.set()
+        if self._hilo:
+            self._hilo.join(timeout=self.timeout)
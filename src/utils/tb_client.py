@@ -1,15 +1,42 @@
 # tb_client.py
+import os
 import requests
 import logging
 
 log = logging.getLogger(__name__)
 
-VPS_URL = "http://217.154.101.202:5000/datos"  # sin barra al final
+# TFM_VPS_URL permite apuntar a otro backend (p. ej. utils.servidor_ingesta en local)
+VPS_URL = os.environ.get("TFM_VPS_URL", "http://217.154.101.202:5000/datos")  # sin barra al final
 
-def publish_telemetry(payload: dict) -> None:
-    """Envía el diccionario a tu backend Flask vía HTTP POST."""
+def publish_telemetry(payload: dict, url: str | None = None) -> bool:
+    """Envía el diccionario a tu backend Flask vía HTTP POST. Devuelve True si se aceptó."""
     try:
-        response = requests.post(VPS_URL, json=payload, timeout=5)
+        response = requests.post(url or VPS_URL, json=payload, timeout=5)
         response.raise_for_status()
+        return True
     except Exception:
         log.error("Error enviando datos al VPS", exc_info=True)
+        return False
+
+def publish_telemetry_lote(payloads: list[dict], url: str | None = None) -> bool:
+    """Envía varias muestras en una sola petición a <VPS_URL>/lote."""
+    try:
+        response = requests.post(f"{url or VPS_URL}/lote", json=payloads, timeout=10)
+        response.raise_for_status()
+        return True
+    except Exception:
+        log.error("Error enviando lote de %d muestras al VPS", len(payloads), exc_info=True)
+        return False
+
+def publish_telemetry_binaria(trama: bytes, url: str | None = None) -> bool:
+    """Envía una trama de utils.codificacion a <VPS_URL>/bin."""
+    try:
+        response = requests.post(
+            f"{url or VPS_URL}/bin", data=trama, timeout=5,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        response.raise_for_status()
+        return True
+    except Exception:
+        log.error("Error enviando trama binaria al VPS", exc_info=True)
+        return False